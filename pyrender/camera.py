@@ -32,6 +32,11 @@ class Camera(object):
         The user-defined name of this object.
     """
 
+    # Scenes index these objects by identity; pin the default identity
+    # equality and hashing so membership checks stay O(1)
+    __hash__ = object.__hash__
+    __eq__ = object.__eq__
+
     def __init__(self,
                  znear=DEFAULT_Z_NEAR,
                  zfar=DEFAULT_Z_FAR,
@@ -236,36 +236,37 @@ class Font(object):
         x += xoff
         y += yoff
 
-        ch = None
-        for c in text:
-            ch = self._character_map[c]
+        # Pack every glyph's quad into one vertex array and upload it in
+        # a single glBufferData call; glyphs still draw one at a time
+        # because each has its own texture, but at fixed VBO offsets
+        chars = [self._character_map[c] for c in text]
+        vertices = np.empty((6 * len(chars), 4), dtype=np.float32)
+        for i, ch in enumerate(chars):
             xpos = x + ch.bearing[0] * scale
             ypos = y - (ch.size[1] - ch.bearing[1]) * scale
             w = ch.size[0] * scale
             h = ch.size[1] * scale
 
-            vertices = np.array([
+            vertices[6 * i:6 * i + 6] = [
                 [xpos, ypos, 0.0, 0.0],
                 [xpos + w, ypos, 1.0, 0.0],
                 [xpos + w, ypos + h, 1.0, 1.0],
                 [xpos + w, ypos + h, 1.0, 1.0],
                 [xpos, ypos + h, 0.0, 1.0],
                 [xpos, ypos, 0.0, 0.0],
-            ], dtype=np.float32)
+            ]
+            x += (ch.advance >> 6) * scale
 
-            ch.texture._bind()
+        glBindBuffer(GL_ARRAY_BUFFER, self._vbo)
+        glBufferData(
+            GL_ARRAY_BUFFER, FLOAT_SZ * vertices.size, vertices,
+            GL_DYNAMIC_DRAW
+        )
 
-            glBindBuffer(GL_ARRAY_BUFFER, self._vbo)
-            glBufferData(
-                GL_ARRAY_BUFFER, FLOAT_SZ * 6 * 4, vertices, GL_DYNAMIC_DRAW
-            )
-            # TODO MAKE THIS MORE EFFICIENT, lgBufferSubData is broken
-            # glBufferSubData(
-            #     GL_ARRAY_BUFFER, 0, 6 * 4 * FLOAT_SZ,
-            #     np.ascontiguousarray(vertices.flatten)
-            # )
-            glDrawArrays(GL_TRIANGLES, 0, 6)
-            x += (ch.advance >> 6) * scale
+        ch = None
+        for i, ch in enumerate(chars):
+            ch.texture._bind()
+            glDrawArrays(GL_TRIANGLES, 6 * i, 6)
 
         self._unbind()
         if ch:
@@ -31,6 +31,11 @@ class Light(object):
     name : str, optional
         Name of the light.
     """
+    # Scenes index these objects by identity; pin the default identity
+    # equality and hashing so membership checks stay O(1)
+    __hash__ = object.__hash__
+    __eq__ = object.__eq__
+
     def __init__(self,
                  color=None,
                  intensity=None,
@@ -140,6 +145,9 @@ class DirectionalLight(Light):
         Name of the light.
     """
 
+    # Tag used by Scene for dict-dispatch instead of isinstance checks
+    _kind = 'directional'
+
     def __init__(self,
                  color=None,
                  intensity=None,
@@ -205,6 +213,8 @@ class PointLight(Light):
         Name of the light.
     """
 
+    _kind = 'point'
+
     def __init__(self,
                  color=None,
                  intensity=None,
@@ -293,6 +303,8 @@ class SpotLight(Light):
         Name of the light.
     """
 
+    _kind = 'spot'
+
     def __init__(self,
                  color=None,
                  intensity=None,
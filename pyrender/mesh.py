@@ -28,6 +28,11 @@ class Mesh(object):
         If False, the mesh will not be rendered.
     """
 
+    # Scenes index these objects by identity; pin the default identity
+    # equality and hashing so membership checks stay O(1)
+    __hash__ = object.__hash__
+    __eq__ = object.__eq__
+
     def __init__(self, primitives, name=None, weights=None, is_visible=True):
         self.primitives = primitives
         self.name = name
@@ -35,6 +40,7 @@ class Mesh(object):
         self.is_visible = is_visible
 
         self._bounds = None
+        self._corners = None
 
     @property
     def name(self):
@@ -92,6 +98,16 @@ class Mesh(object):
             self._bounds = bounds
         return self._bounds
 
+    @property
+    def corners(self):
+        """(8,3) float : The eight corners of the mesh's AABB.
+        """
+        if self._corners is None:
+            self._corners = np.ascontiguousarray(
+                trimesh.bounds.corners(self.bounds), dtype=np.float64
+            )
+        return self._corners
+
     @property
     def centroid(self):
         """(3,) float : The centroid of the mesh's axis-aligned bounding box
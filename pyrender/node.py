@@ -44,6 +44,11 @@ class Node(object):
         The light in this node.
     """
 
+    # Scenes index these objects by identity; pin the default identity
+    # equality and hashing so membership checks stay O(1)
+    __hash__ = object.__hash__
+    __eq__ = object.__eq__
+
     def __init__(self,
                  name=None,
                  camera=None,
@@ -60,6 +65,10 @@ class Node(object):
         if children is None:
             children = []
 
+        # Bumped whenever the local transform changes; scenes use it to
+        # validate cached world poses against direct setter writes
+        self._tf_version = 0
+
         self._matrix = None
         self._scale = None
         self._rotation = None
@@ -168,6 +177,7 @@ class Node(object):
             raise ValueError('Quaternion must have norm == 1.0')
         self._rotation = value
         self._matrix = None
+        self._tf_version += 1
 
     @property
     def translation(self):
@@ -182,6 +192,7 @@ class Node(object):
             raise ValueError('Translation must be a (3,) vector')
         self._translation = value
         self._matrix = None
+        self._tf_version += 1
 
     @property
     def scale(self):
@@ -196,6 +207,7 @@ class Node(object):
             raise ValueError('Scale must be a (3,) vector')
         self._scale = value
         self._matrix = None
+        self._tf_version += 1
 
     @property
     def matrix(self):
@@ -2,6 +2,7 @@
 
 Author: Matthew Matl
 """
+import ctypes
 import sys
 
 import numpy as np
@@ -19,6 +20,21 @@ from .utils import format_color_vector
 from OpenGL.GL import *
 
 
+# Tiled shadowmap-debug viewport layout, keyed by (tile index, n tiles)
+# and expressed as fractions of the viewport width/height
+_TILED_VIEWPORT_LAYOUT = {
+    (0, 2): (0.0, 0.5, 0.5, 1.0),
+    (1, 2): (0.5, 0.5, 1.0, 1.0),
+    (0, 3): (0.0, 0.5, 0.5, 1.0),
+    (1, 3): (0.5, 0.5, 1.0, 1.0),
+    (2, 3): (0.0, 0.0, 0.5, 0.5),
+    (0, 4): (0.0, 0.5, 0.5, 1.0),
+    (1, 4): (0.5, 0.5, 1.0, 1.0),
+    (2, 4): (0.0, 0.0, 0.5, 0.5),
+    (3, 4): (0.5, 0.0, 1.0, 0.5)
+}
+
+
 class Renderer(object):
     """Class for handling all rendering operations on a scene.
 
@@ -39,9 +55,14 @@ class Renderer(object):
 
     def __init__(self, viewport_width, viewport_height, point_size=1.0):
         self.dpscale = 1
-        # Scaling needed on retina displays
+        # Scaling needed on retina displays; specialize the readback
+        # resize to a no-op everywhere else so the hot path skips the
+        # platform check entirely
         if sys.platform == 'darwin':
             self.dpscale = 2
+            self._maybe_resize = self._resize_image
+        else:
+            self._maybe_resize = lambda value, antialias=False: value
 
         self.viewport_width = viewport_width
         self.viewport_height = viewport_height
@@ -55,7 +76,21 @@ class Renderer(object):
         self._main_cb_ms = None
         self._main_db_ms = None
         self._main_fb_dims = (None, None)
+        self._color_read_buf_rgb = None
+        self._color_read_buf_rgba = None
+        self._depth_read_buf = None
         self._shadow_fb = None
+
+        # Last computed view matrix, keyed on the camera pose bytes so
+        # idle frames skip the 4x4 inversion
+        self._view_mat_key = None
+        self._view_mat = None
+
+        # Ping-ponged pixel-pack buffers for asynchronous color reads
+        self._pack_pbos = None
+        self._pack_pbo_size = None
+        self._pack_pbo_idx = 0
+        self._pack_pbo_pending = [False, False]
         self._latest_znear = DEFAULT_Z_NEAR
         self._latest_zfar = DEFAULT_Z_FAR
 
@@ -66,6 +101,7 @@ class Renderer(object):
         self._mesh_textures = set()
         self._shadow_textures = set()
         self._texture_alloc_idx = 0
+        self._viewport_dims_cache = {}
 
     @property
     def viewport_width(self):
@@ -185,23 +221,36 @@ class Renderer(object):
             :attr:`TextAlign.BOTTOM_LEFT` means that ``x`` and ``y`` indicate
             the position of the bottom-left corner of the textbox.
         """
-        x *= self.dpscale
-        y *= self.dpscale
-        font_pt *= self.dpscale
+        self.render_texts([{
+            'text': text, 'x': x, 'y': y, 'font_name': font_name,
+            'font_pt': font_pt, 'color': color, 'scale': scale,
+            'align': align
+        }])
 
-        if color is None:
-            color = np.array([0.0, 0.0, 0.0, 1.0])
-        else:
-            color = format_color_vector(color, 4)
+    def render_texts(self, entries):
+        """Render several pieces of text in one pass.
+
+        The viewport, shader program, and projection are configured once
+        for the whole batch, so drawing n captions costs one state setup
+        plus one color uniform and string draw per caption.
+
+        Note
+        ----
+        This cannot be done into an offscreen buffer.
+
+        Parameters
+        ----------
+        entries : list of dict
+            One dict per piece of text, with the same keys as the
+            parameters of :meth:`.Renderer.render_text`. ``text``, ``x``,
+            and ``y`` are required; the rest take the same defaults.
+        """
+        if not entries:
+            return
 
         # Set up viewport for render
         self._configure_forward_pass_viewport(0)
 
-        # Load font
-        font = self._font_cache.get_font(font_name, font_pt)
-        if not font._in_context():
-            font._add_to_context()
-
         # Load program
         program = self._get_text_program()
         program._bind()
@@ -213,16 +262,44 @@ class Renderer(object):
         p[1,1] = 2.0 / self.viewport_height
         p[1,3] = -1.0
         program.set_uniform('projection', p)
-        program.set_uniform('text_color', color)
 
-        # Draw text
-        font.render_string(text, x, y, scale, align)
+        for entry in entries:
+            color = entry.get('color')
+            if color is None:
+                color = np.array([0.0, 0.0, 0.0, 1.0])
+            else:
+                color = format_color_vector(color, 4)
+            program.set_uniform('text_color', color)
 
-    def read_color_buf(self):
+            # Load font
+            font = self._font_cache.get_font(
+                entry.get('font_name', 'OpenSans-Regular'),
+                entry.get('font_pt', 40) * self.dpscale
+            )
+            if not font._in_context():
+                font._add_to_context()
+
+            # Draw text
+            font.render_string(
+                entry['text'],
+                entry['x'] * self.dpscale, entry['y'] * self.dpscale,
+                entry.get('scale', 1.0),
+                entry.get('align', TextAlign.BOTTOM_LEFT)
+            )
+
+    def read_color_buf(self, out=None):
         """Read and return the current viewport's color buffer.
 
         Alpha cannot be computed for an on-screen buffer.
 
+        Parameters
+        ----------
+        out : (h, w, 3) uint8, optional
+            A preallocated buffer to fill and return. When given, the
+            pixels are flipped directly into it and no output array is
+            allocated, so callers reading every frame can reuse one
+            buffer.
+
         Returns
         -------
         color_im : (h, w, 3) uint8
@@ -237,14 +314,95 @@ class Renderer(object):
         # Re-format them into numpy arrays
         color_im = np.frombuffer(color_buf, dtype=np.uint8)
         color_im = color_im.reshape((height, width, 3))
+        if out is not None:
+            if out.shape != (height, width, 3) or out.dtype != np.uint8:
+                raise ValueError(
+                    'out must be a ({}, {}, 3) uint8 array'.format(
+                        height, width
+                    )
+                )
+            # One-pass row flip straight into the caller's buffer
+            np.copyto(out, color_im[::-1])
+            return self._maybe_resize(out, True)
         color_im = np.flip(color_im, axis=0)
 
         # Resize for macos if needed
-        if sys.platform == 'darwin':
-            color_im = self._resize_image(color_im, True)
+        color_im = self._maybe_resize(color_im, True)
 
         return color_im
 
+    def read_color_buf_async(self):
+        """Read the color buffer through ping-ponged pixel-pack buffers.
+
+        Each call kicks off an asynchronous GPU read of the current
+        frame and returns the frame requested by the previous call, so
+        the CPU copy overlaps with the next render instead of stalling
+        the pipeline. The returned image therefore lags the display by
+        one call.
+
+        Returns
+        -------
+        color_im : (h, w, 3) uint8 or None
+            The color buffer from the previous call, or None on the
+            first call (and after a viewport resize).
+        """
+        width, height = self.viewport_width, self.viewport_height
+        nbytes = width * height * 3
+        if self._pack_pbos is None or self._pack_pbo_size != nbytes:
+            self._delete_pack_pbos()
+            pbos = glGenBuffers(2)
+            self._pack_pbos = [int(pbos[0]), int(pbos[1])]
+            for pbo in self._pack_pbos:
+                glBindBuffer(GL_PIXEL_PACK_BUFFER, pbo)
+                glBufferData(
+                    GL_PIXEL_PACK_BUFFER, nbytes, None, GL_STREAM_READ
+                )
+            self._pack_pbo_size = nbytes
+            self._pack_pbo_idx = 0
+            self._pack_pbo_pending = [False, False]
+
+        # Start reading the current frame into one buffer; the call
+        # returns immediately since the target is GPU memory
+        i = self._pack_pbo_idx
+        glBindFramebuffer(GL_READ_FRAMEBUFFER, 0)
+        glReadBuffer(GL_FRONT)
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, self._pack_pbos[i])
+        glReadPixels(
+            0, 0, width, height, GL_RGB, GL_UNSIGNED_BYTE,
+            ctypes.c_void_p(0)
+        )
+        self._pack_pbo_pending[i] = True
+
+        # Map the other buffer, whose read was issued a frame ago and
+        # has had a full frame's time to complete
+        color_im = None
+        j = 1 - i
+        if self._pack_pbo_pending[j]:
+            glBindBuffer(GL_PIXEL_PACK_BUFFER, self._pack_pbos[j])
+            ptr = glMapBufferRange(
+                GL_PIXEL_PACK_BUFFER, 0, nbytes, GL_MAP_READ_BIT
+            )
+            if ptr:
+                buf = (ctypes.c_ubyte * nbytes).from_address(ptr)
+                color_im = np.frombuffer(buf, dtype=np.uint8).reshape(
+                    (height, width, 3)
+                )[::-1].copy()
+                glUnmapBuffer(GL_PIXEL_PACK_BUFFER)
+                color_im = self._maybe_resize(color_im, True)
+            self._pack_pbo_pending[j] = False
+
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+        self._pack_pbo_idx = j
+        return color_im
+
+    def _delete_pack_pbos(self):
+        if self._pack_pbos is not None:
+            glDeleteBuffers(2, self._pack_pbos)
+            self._pack_pbos = None
+            self._pack_pbo_size = None
+            self._pack_pbo_idx = 0
+            self._pack_pbo_pending = [False, False]
+
     def read_depth_buf(self):
         """Read and return the current viewport's color buffer.
 
@@ -277,8 +435,7 @@ class Renderer(object):
         depth_im[inf_inds] = 0.0
 
         # Resize for macos if needed
-        if sys.platform == 'darwin':
-            depth_im = self._resize_image(depth_im)
+        depth_im = self._maybe_resize(depth_im)
 
         return depth_im
 
@@ -310,6 +467,7 @@ class Renderer(object):
 
         self._delete_main_framebuffer()
         self._delete_shadow_framebuffer()
+        self._delete_pack_pbos()
 
     def __del__(self):
         try:
@@ -698,7 +856,7 @@ class Renderer(object):
         cam_loc = scene.get_pose(scene.main_camera_node)[:3,3]
         solid_nodes = []
         trans_nodes = []
-        for node in scene.mesh_nodes:
+        for node in scene.mesh_nodes_list:
             mesh = node.mesh
             if mesh.is_transparent:
                 trans_nodes.append(node)
@@ -821,8 +979,12 @@ class Renderer(object):
             width=self.viewport_width, height=self.viewport_height
         )
         pose = scene.get_pose(main_camera_node)
-        V = np.linalg.inv(pose)  # V maps from world to camera
-        return V, P
+        key = pose.tobytes()
+        if key != self._view_mat_key:
+            # V maps from world to camera
+            self._view_mat = np.linalg.inv(pose)
+            self._view_mat_key = key
+        return self._view_mat, P
 
     def _get_light_cam_matrices(self, scene, light_node, flags):
         light = light_node.light
@@ -995,6 +1157,7 @@ class Renderer(object):
             geometry_shader=geometry_shader,
             defines=defines
         )
+        program._max_n_lights = max_n_lights
 
         if not program._in_context():
             program._add_to_context()
@@ -1060,57 +1223,112 @@ class Renderer(object):
 
         # If framebuffer doesn't exist, create it
         if self._main_fb is None:
-            # Generate standard buffer
-            self._main_cb, self._main_db = glGenRenderbuffers(2)
+            if bool(glCreateRenderbuffers):
+                # GL 4.5 direct-state-access path: configure each object
+                # with a single named call and no bind churn
+                rbs = (GLuint * 2)()
+                glCreateRenderbuffers(2, rbs)
+                self._main_cb, self._main_db = rbs[0], rbs[1]
+                glNamedRenderbufferStorage(
+                    self._main_cb, GL_RGBA,
+                    self.viewport_width, self.viewport_height
+                )
+                glNamedRenderbufferStorage(
+                    self._main_db, GL_DEPTH_COMPONENT24,
+                    self.viewport_width, self.viewport_height
+                )
 
-            glBindRenderbuffer(GL_RENDERBUFFER, self._main_cb)
-            glRenderbufferStorage(
-                GL_RENDERBUFFER, GL_RGBA,
-                self.viewport_width, self.viewport_height
-            )
+                fbs = (GLuint * 2)()
+                glCreateFramebuffers(2, fbs)
+                self._main_fb, self._main_fb_ms = fbs[0], fbs[1]
+                glNamedFramebufferRenderbuffer(
+                    self._main_fb, GL_COLOR_ATTACHMENT0,
+                    GL_RENDERBUFFER, self._main_cb
+                )
+                glNamedFramebufferRenderbuffer(
+                    self._main_fb, GL_DEPTH_ATTACHMENT,
+                    GL_RENDERBUFFER, self._main_db
+                )
 
-            glBindRenderbuffer(GL_RENDERBUFFER, self._main_db)
-            glRenderbufferStorage(
-                GL_RENDERBUFFER, GL_DEPTH_COMPONENT24,
-                self.viewport_width, self.viewport_height
-            )
+                # Generate multisample buffer
+                glCreateRenderbuffers(2, rbs)
+                self._main_cb_ms, self._main_db_ms = rbs[0], rbs[1]
+                glNamedRenderbufferStorageMultisample(
+                    self._main_cb_ms, 4, GL_RGBA,
+                    self.viewport_width, self.viewport_height
+                )
+                glNamedRenderbufferStorageMultisample(
+                    self._main_db_ms, 4, GL_DEPTH_COMPONENT24,
+                    self.viewport_width, self.viewport_height
+                )
+                glNamedFramebufferRenderbuffer(
+                    self._main_fb_ms, GL_COLOR_ATTACHMENT0,
+                    GL_RENDERBUFFER, self._main_cb_ms
+                )
+                glNamedFramebufferRenderbuffer(
+                    self._main_fb_ms, GL_DEPTH_ATTACHMENT,
+                    GL_RENDERBUFFER, self._main_db_ms
+                )
+            else:
+                # Generate standard buffer
+                self._main_cb, self._main_db = glGenRenderbuffers(2)
 
-            self._main_fb = glGenFramebuffers(1)
-            glBindFramebuffer(GL_DRAW_FRAMEBUFFER, self._main_fb)
-            glFramebufferRenderbuffer(
-                GL_DRAW_FRAMEBUFFER, GL_COLOR_ATTACHMENT0,
-                GL_RENDERBUFFER, self._main_cb
-            )
-            glFramebufferRenderbuffer(
-                GL_DRAW_FRAMEBUFFER, GL_DEPTH_ATTACHMENT,
-                GL_RENDERBUFFER, self._main_db
-            )
+                glBindRenderbuffer(GL_RENDERBUFFER, self._main_cb)
+                glRenderbufferStorage(
+                    GL_RENDERBUFFER, GL_RGBA,
+                    self.viewport_width, self.viewport_height
+                )
 
-            # Generate multisample buffer
-            self._main_cb_ms, self._main_db_ms = glGenRenderbuffers(2)
-            glBindRenderbuffer(GL_RENDERBUFFER, self._main_cb_ms)
-            glRenderbufferStorageMultisample(
-                GL_RENDERBUFFER, 4, GL_RGBA,
-                self.viewport_width, self.viewport_height
-            )
-            glBindRenderbuffer(GL_RENDERBUFFER, self._main_db_ms)
-            glRenderbufferStorageMultisample(
-                GL_RENDERBUFFER, 4, GL_DEPTH_COMPONENT24,
-                self.viewport_width, self.viewport_height
-            )
-            self._main_fb_ms = glGenFramebuffers(1)
-            glBindFramebuffer(GL_DRAW_FRAMEBUFFER, self._main_fb_ms)
-            glFramebufferRenderbuffer(
-                GL_DRAW_FRAMEBUFFER, GL_COLOR_ATTACHMENT0,
-                GL_RENDERBUFFER, self._main_cb_ms
-            )
-            glFramebufferRenderbuffer(
-                GL_DRAW_FRAMEBUFFER, GL_DEPTH_ATTACHMENT,
-                GL_RENDERBUFFER, self._main_db_ms
-            )
+                glBindRenderbuffer(GL_RENDERBUFFER, self._main_db)
+                glRenderbufferStorage(
+                    GL_RENDERBUFFER, GL_DEPTH_COMPONENT24,
+                    self.viewport_width, self.viewport_height
+                )
+
+                self._main_fb = glGenFramebuffers(1)
+                glBindFramebuffer(GL_DRAW_FRAMEBUFFER, self._main_fb)
+                glFramebufferRenderbuffer(
+                    GL_DRAW_FRAMEBUFFER, GL_COLOR_ATTACHMENT0,
+                    GL_RENDERBUFFER, self._main_cb
+                )
+                glFramebufferRenderbuffer(
+                    GL_DRAW_FRAMEBUFFER, GL_DEPTH_ATTACHMENT,
+                    GL_RENDERBUFFER, self._main_db
+                )
+
+                # Generate multisample buffer
+                self._main_cb_ms, self._main_db_ms = glGenRenderbuffers(2)
+                glBindRenderbuffer(GL_RENDERBUFFER, self._main_cb_ms)
+                glRenderbufferStorageMultisample(
+                    GL_RENDERBUFFER, 4, GL_RGBA,
+                    self.viewport_width, self.viewport_height
+                )
+                glBindRenderbuffer(GL_RENDERBUFFER, self._main_db_ms)
+                glRenderbufferStorageMultisample(
+                    GL_RENDERBUFFER, 4, GL_DEPTH_COMPONENT24,
+                    self.viewport_width, self.viewport_height
+                )
+                self._main_fb_ms = glGenFramebuffers(1)
+                glBindFramebuffer(GL_DRAW_FRAMEBUFFER, self._main_fb_ms)
+                glFramebufferRenderbuffer(
+                    GL_DRAW_FRAMEBUFFER, GL_COLOR_ATTACHMENT0,
+                    GL_RENDERBUFFER, self._main_cb_ms
+                )
+                glFramebufferRenderbuffer(
+                    GL_DRAW_FRAMEBUFFER, GL_DEPTH_ATTACHMENT,
+                    GL_RENDERBUFFER, self._main_db_ms
+                )
 
             self._main_fb_dims = (self.viewport_width, self.viewport_height)
 
+            # Preallocate readback storage so that glReadPixels writes
+            # directly into reusable buffers instead of allocating a
+            # fresh bytes object every frame
+            w, h = self._main_fb_dims
+            self._color_read_buf_rgb = (GLubyte * (w * h * 3))()
+            self._color_read_buf_rgba = (GLubyte * (w * h * 4))()
+            self._depth_read_buf = (GLfloat * (w * h))()
+
     def _delete_main_framebuffer(self):
         if self._main_fb is not None:
             glDeleteFramebuffers(2, [self._main_fb, self._main_fb_ms])
@@ -1126,6 +1344,9 @@ class Renderer(object):
         self._main_cb_ms = None
         self._main_db_ms = None
         self._main_fb_dims = (None, None)
+        self._color_read_buf_rgb = None
+        self._color_read_buf_rgba = None
+        self._depth_read_buf = None
 
     def _read_main_framebuffer(self, scene, flags):
         width, height = self._main_fb_dims[0], self._main_fb_dims[1]
@@ -1141,13 +1362,27 @@ class Renderer(object):
             0, 0, width, height, 0, 0, width, height,
             GL_DEPTH_BUFFER_BIT, GL_NEAREST
         )
+
+        # The multisample buffers have been resolved and won't be read
+        # again this frame -- let tiling drivers discard them rather than
+        # writing them back to memory
+        if bool(glInvalidateFramebuffer):
+            glBindFramebuffer(GL_READ_FRAMEBUFFER, self._main_fb_ms)
+            glInvalidateFramebuffer(
+                GL_READ_FRAMEBUFFER, 2,
+                (GLenum * 2)(GL_COLOR_ATTACHMENT0, GL_DEPTH_ATTACHMENT)
+            )
+
         glBindFramebuffer(GL_READ_FRAMEBUFFER, self._main_fb)
 
-        # Read depth
-        depth_buf = glReadPixels(
-            0, 0, width, height, GL_DEPTH_COMPONENT, GL_FLOAT
+        # Read depth straight into the preallocated buffer and wrap it
+        # zero-copy; the arithmetic below produces fresh arrays, so the
+        # buffer is safe to reuse next frame
+        glReadPixels(
+            0, 0, width, height, GL_DEPTH_COMPONENT, GL_FLOAT,
+            self._depth_read_buf
         )
-        depth_im = np.frombuffer(depth_buf, dtype=np.float32)
+        depth_im = np.frombuffer(self._depth_read_buf, dtype=np.float32)
         depth_im = depth_im.reshape((height, width))
         depth_im = np.flip(depth_im, axis=0)
         inf_inds = (depth_im == 1.0)
@@ -1163,31 +1398,41 @@ class Renderer(object):
                                 (z_far - z_near)))
         depth_im[inf_inds] = 0.0
 
+        # Only color is consumed from here on -- the resolved depth
+        # attachment can be discarded as well
+        if bool(glInvalidateFramebuffer):
+            glInvalidateFramebuffer(
+                GL_READ_FRAMEBUFFER, 1, (GLenum * 1)(GL_DEPTH_ATTACHMENT)
+            )
+
         # Resize for macos if needed
-        if sys.platform == 'darwin':
-            depth_im = self._resize_image(depth_im)
+        depth_im = self._maybe_resize(depth_im)
 
         if flags & RenderFlags.DEPTH_ONLY:
             return depth_im
 
-        # Read color
+        # Read color into the preallocated buffer for its format; the
+        # returned image is copied out so the buffer can be reused
         if flags & RenderFlags.RGBA:
-            color_buf = glReadPixels(
-                0, 0, width, height, GL_RGBA, GL_UNSIGNED_BYTE
+            glReadPixels(
+                0, 0, width, height, GL_RGBA, GL_UNSIGNED_BYTE,
+                self._color_read_buf_rgba
             )
-            color_im = np.frombuffer(color_buf, dtype=np.uint8)
+            color_im = np.frombuffer(self._color_read_buf_rgba,
+                                     dtype=np.uint8)
             color_im = color_im.reshape((height, width, 4))
         else:
-            color_buf = glReadPixels(
-                0, 0, width, height, GL_RGB, GL_UNSIGNED_BYTE
+            glReadPixels(
+                0, 0, width, height, GL_RGB, GL_UNSIGNED_BYTE,
+                self._color_read_buf_rgb
             )
-            color_im = np.frombuffer(color_buf, dtype=np.uint8)
+            color_im = np.frombuffer(self._color_read_buf_rgb,
+                                     dtype=np.uint8)
             color_im = color_im.reshape((height, width, 3))
-        color_im = np.flip(color_im, axis=0)
+        color_im = np.flip(color_im, axis=0).copy()
 
         # Resize for macos if needed
-        if sys.platform == 'darwin':
-            color_im = self._resize_image(color_im, True)
+        color_im = self._maybe_resize(color_im, True)
 
         return color_im, depth_im
 
@@ -1233,8 +1478,11 @@ class Renderer(object):
                     'cam_pos', scene.get_pose(scene.main_camera_node)[:3,3]
                 )
 
-                # Next, bind the lighting
-                if not flags & RenderFlags.DEPTH_ONLY and not flags & RenderFlags.FLAT:
+                # Next, bind the lighting, unless the program was
+                # compiled with room for zero lights of every type
+                if (not flags & RenderFlags.DEPTH_ONLY and
+                        not flags & RenderFlags.FLAT and
+                        any(program._max_n_lights)):
                     self._bind_lighting(scene, program, node, flags)
 
                 # Finally, bind and draw the primitive
@@ -1264,17 +1512,14 @@ class Renderer(object):
         h = self.viewport_height
 
         num_nodes = len(light_nodes)
-        viewport_dims = {
-            (0, 2): [0, h // 2, w // 2, h],
-            (1, 2): [w // 2, h // 2, w, h],
-            (0, 3): [0, h // 2, w // 2, h],
-            (1, 3): [w // 2, h // 2, w, h],
-            (2, 3): [0, 0, w // 2, h // 2],
-            (0, 4): [0, h // 2, w // 2, h],
-            (1, 4): [w // 2, h // 2, w, h],
-            (2, 4): [0, 0, w // 2, h // 2],
-            (3, 4): [w // 2, 0, w, h // 2]
-        }
+        viewport_dims = self._viewport_dims_cache.get((w, h))
+        if viewport_dims is None:
+            viewport_dims = {
+                key: [int(fx0 * w), int(fy0 * h), int(fx1 * w), int(fy1 * h)]
+                for key, (fx0, fy0, fx1, fy1)
+                in _TILED_VIEWPORT_LAYOUT.items()
+            }
+            self._viewport_dims_cache[(w, h)] = viewport_dims
 
         if tile:
             for i, ln in enumerate(light_nodes):
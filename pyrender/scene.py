@@ -3,13 +3,14 @@ https://github.com/KhronosGroup/glTF/tree/master/specification/2.0#reference-sce
 
 Author: Matthew Matl
 """
+from collections import defaultdict
+from functools import reduce
+
 import numpy as np
-import networkx as nx
-import trimesh
 
 from .mesh import Mesh
 from .camera import Camera
-from .light import Light, PointLight, DirectionalLight, SpotLight
+from .light import Light
 from .node import Node
 from .utils import format_color_vector
 
@@ -51,21 +52,30 @@ class Scene(object):
         self.ambient_light = ambient_light
         self.name = name
 
-        self._name_to_nodes = {}
-        self._obj_to_nodes = {}
-        self._obj_name_to_nodes = {}
+        self._name_to_nodes = defaultdict(set)
+        self._obj_to_nodes = defaultdict(set)
+        self._obj_name_to_nodes = defaultdict(set)
         self._mesh_nodes = set()
+        self._mesh_nodes_list = []
+        self._mesh_nodes_idx = {}
         self._point_light_nodes = set()
         self._spot_light_nodes = set()
         self._directional_light_nodes = set()
+        self._light_sets = {
+            'point': self._point_light_nodes,
+            'spot': self._spot_light_nodes,
+            'directional': self._directional_light_nodes
+        }
         self._camera_nodes = set()
         self._main_camera_node = None
         self._bounds = None
+        self._node_world_aabb = {}
 
-        # Transform tree
-        self._digraph = nx.DiGraph()
-        self._digraph.add_node('world')
+        # Transform tree, stored as a map from each node to its parent
+        # (either another Node or the 'world' frame)
+        self._parent = {}
         self._path_cache = {}
+        self._pose_cache = {}
 
         # Find root nodes and add them
         if len(nodes) > 0:
@@ -138,6 +148,13 @@ class Scene(object):
         """
         return self._mesh_nodes
 
+    @property
+    def mesh_nodes_list(self):
+        """list of :class:`Node` : The nodes containing meshes, in a
+        stable iteration order.
+        """
+        return self._mesh_nodes_list
+
     @property
     def lights(self):
         """set of :class:`Light` : The lights in the scene.
@@ -218,20 +235,28 @@ class Scene(object):
         """(2,3) float : The axis-aligned bounds of the scene.
         """
         if self._bounds is None:
-            # Compute corners
-            corners = []
-            for mesh_node in self.mesh_nodes:
-                mesh = mesh_node.mesh
-                pose = self.get_pose(mesh_node)
-                corners_local = trimesh.bounds.corners(mesh.bounds)
-                corners_world = pose[:3,:3].dot(corners_local.T).T + pose[:3,3]
-                corners.append(corners_world)
-            if len(corners) == 0:
+            mesh_nodes = self._mesh_nodes_list
+            if len(mesh_nodes) == 0:
                 self._bounds = np.zeros((2,3))
             else:
-                corners = np.vstack(corners)
-                self._bounds = np.array([np.min(corners, axis=0),
-                                         np.max(corners, axis=0)])
+                # Transform all mesh corners with one batched matmul
+                # rather than one small matmul per mesh
+                poses = [self.get_pose(n) for n in mesh_nodes]
+                rots = np.stack([p[:3,:3] for p in poses])
+                trans = np.stack([p[:3,3] for p in poses])
+                corners_local = np.stack([
+                    n.mesh.corners for n in mesh_nodes
+                ])
+                corners_world = (
+                    np.einsum('nij,nkj->nki', rots, corners_local) +
+                    trans[:,None,:]
+                )
+                mins = np.min(corners_world, axis=1)
+                maxs = np.max(corners_world, axis=1)
+                for n, lo, hi in zip(mesh_nodes, mins, maxs):
+                    self._node_world_aabb[n] = np.array([lo, hi])
+                self._bounds = np.array([np.min(mins, axis=0),
+                                         np.max(maxs, axis=0)])
         return self._bounds
 
     @property
@@ -324,22 +349,22 @@ class Scene(object):
                 return set([node])
             else:
                 return set()
-        nodes = set(self.nodes)
+
+        # Intersect only the index sets for the given query terms so
+        # that no O(N) copy of the full node set is ever made
+        match_sets = []
         if name is not None:
-            matches = set()
-            if name in self._name_to_nodes:
-                matches = self._name_to_nodes[name]
-            nodes = nodes & matches
+            match_sets.append(self._name_to_nodes.get(name, set()))
         if obj is not None:
-            matches = set()
-            if obj in self._obj_to_nodes:
-                matches = self._obj_to_nodes[obj]
-            nodes = nodes & matches
+            match_sets.append(self._obj_to_nodes.get(obj, set()))
         if obj_name is not None:
-            matches = set()
-            if obj_name in self._obj_name_to_nodes:
-                matches = self._obj_name_to_nodes[obj_name]
-            nodes = nodes & matches
+            match_sets.append(self._obj_name_to_nodes.get(obj_name, set()))
+
+        if len(match_sets) == 0:
+            return set(self.nodes)
+        nodes = set(match_sets[0])
+        for matches in match_sets[1:]:
+            nodes &= matches
 
         return nodes
 
@@ -353,33 +378,74 @@ class Scene(object):
         parent_node : :class:`Node`
             The parent of this Node. If None, the new node is a root node.
         """
+        self.add_nodes_bulk([(node, parent_node)])
+
+    def add_nodes_bulk(self, nodes_with_parents):
+        """Add many subtrees at once with a single cache invalidation.
+
+        Parameters
+        ----------
+        nodes_with_parents : list of tuple
+            Pairs of ``(node, parent_node)`` to add, where a parent of
+            None makes the corresponding node a root node.
+        """
+        # Insert the subtrees with an explicit stack, deferring cache
+        # invalidation to a single pass at the end
+        for node, parent_node in nodes_with_parents:
+            stack = [(node, parent_node)]
+            while stack:
+                n, p = stack.pop()
+                self._add_node_internal(n, p)
+                for child in n.children:
+                    stack.append((child, n))
+
+        self._path_cache = {}
+        self._pose_cache = {}
+
+        # Union the new mesh AABBs into the cached bounds rather than
+        # forcing a full rebuild
+        for node, _ in nodes_with_parents:
+            stack = [node]
+            while stack:
+                n = stack.pop()
+                if n.mesh is not None:
+                    aabb = self._compute_node_world_aabb(n)
+                    self._node_world_aabb[n] = aabb
+                    if self._bounds is not None:
+                        self._bounds = np.array([
+                            np.minimum(self._bounds[0], aabb[0]),
+                            np.maximum(self._bounds[1], aabb[1])
+                        ])
+                stack.extend(n.children)
+
+    def _add_node_internal(self, node, parent_node):
+        """Insert a single node without touching the traversal caches.
+
+        Parameters
+        ----------
+        node : :class:`Node`
+            The node to be added.
+        parent_node : :class:`Node` or None
+            The parent of this Node. If None, the new node is a root node.
+        """
         if node in self.nodes:
             raise ValueError('Node already in scene')
         self.nodes.add(node)
 
         # Add node to sets
         if node.name is not None:
-            if node.name not in self._name_to_nodes:
-                self._name_to_nodes[node.name] = set()
             self._name_to_nodes[node.name].add(node)
         for obj in [node.mesh, node.camera, node.light]:
             if obj is not None:
-                if obj not in self._obj_to_nodes:
-                    self._obj_to_nodes[obj] = set()
                 self._obj_to_nodes[obj].add(node)
                 if obj.name is not None:
-                    if obj.name not in self._obj_name_to_nodes:
-                        self._obj_name_to_nodes[obj.name] = set()
                     self._obj_name_to_nodes[obj.name].add(node)
         if node.mesh is not None:
             self._mesh_nodes.add(node)
+            self._mesh_nodes_idx[node] = len(self._mesh_nodes_list)
+            self._mesh_nodes_list.append(node)
         if node.light is not None:
-            if isinstance(node.light, PointLight):
-                self._point_light_nodes.add(node)
-            if isinstance(node.light, SpotLight):
-                self._spot_light_nodes.add(node)
-            if isinstance(node.light, DirectionalLight):
-                self._directional_light_nodes.add(node)
+            self._light_sets[node.light._kind].add(node)
         if node.camera is not None:
             self._camera_nodes.add(node)
             if self._main_camera_node is None:
@@ -392,16 +458,8 @@ class Scene(object):
         elif node not in parent_node.children:
             parent_node.children.append(node)
 
-        # Create node in graph
-        self._digraph.add_node(node)
-        self._digraph.add_edge(node, parent_node)
-
-        # Iterate over children
-        for child in node.children:
-            self.add_node(child, node)
-
-        self._path_cache = {}
-        self._bounds = None
+        # Create node in transform tree
+        self._parent[node] = parent_node
 
     def has_node(self, node):
         """Check if a node is already in the scene.
@@ -426,13 +484,40 @@ class Scene(object):
         node : :class:`Node`
             The node to be removed.
         """
-        # Disconnect self from parent who is staying in the graph
-        parent = list(self._digraph.neighbors(node))[0]
-        self._remove_node(node)
-        if isinstance(parent, Node):
-            parent.children.remove(node)
+        self.remove_nodes_bulk([node])
+
+    def remove_nodes_bulk(self, nodes):
+        """Remove many subtrees at once with a single cache invalidation.
+
+        Parameters
+        ----------
+        nodes : list of :class:`Node`
+            The root nodes of the subtrees to be removed.
+        """
+        dirty = False
+        for node in nodes:
+            # Disconnect self from parent who is staying in the graph
+            parent = self._parent[node]
+            self._remove_node(node)
+            if isinstance(parent, Node):
+                parent.children.remove(node)
+            # Drop the removed mesh AABBs; a rebuild is only needed if
+            # one of them was sitting on the scene AABB's boundary
+            stack = [node]
+            while stack:
+                n = stack.pop()
+                if n.mesh is not None:
+                    aabb = self._node_world_aabb.pop(n, None)
+                    if self._bounds is not None:
+                        if (aabb is None or
+                                np.any(aabb[0] <= self._bounds[0]) or
+                                np.any(aabb[1] >= self._bounds[1])):
+                            dirty = True
+                stack.extend(n.children)
         self._path_cache = {}
-        self._bounds = None
+        self._pose_cache = {}
+        if dirty:
+            self._bounds = None
 
     def get_pose(self, node):
         """Get the world-frame pose of a node in the scene.
@@ -445,7 +530,8 @@ class Scene(object):
         Returns
         -------
         pose : (4,4) float
-            The transform matrix for this node.
+            The transform matrix for this node. The returned array is
+            the caller's to mutate; it never aliases the cache.
         """
         if node not in self.nodes:
             raise ValueError('Node must already be in scene')
@@ -453,15 +539,57 @@ class Scene(object):
             path = self._path_cache[node]
         else:
             # Get path from from_frame to to_frame
-            path = nx.shortest_path(self._digraph, node, 'world')
+            path = []
+            cur = node
+            while cur != 'world':
+                path.append(cur)
+                cur = self._parent[cur]
+            path.append('world')
             self._path_cache[node] = path
 
-        # Traverse from from_node to to_node
-        pose = np.eye(4)
-        for n in path[:-1]:
-            pose = np.dot(n.matrix, pose)
+        # Validate the cached pose against the transform versions of
+        # every node on the path, so direct writes to a node's matrix,
+        # rotation, translation or scale are picked up
+        versions = tuple(n._tf_version for n in path[:-1])
+        cached = self._pose_cache.get(node)
+        if cached is not None and cached[1] == versions:
+            return cached[0].copy()
+
+        # Fold the ancestor chain root-to-node, skipping the identity
+        # seed and the per-step np.dot dispatch of the old loop
+        pose = reduce(np.matmul, [n.matrix for n in path[-2::-1]])
+        self._pose_cache[node] = (pose, versions)
+
+        # Hand out a copy so callers that edit the result in place
+        # cannot corrupt the cached entry
+        return pose.copy()
+
+    def compute_all_poses(self):
+        """Compute the world-frame pose of every node in a single pass.
+
+        This is equivalent to calling :meth:`get_pose` on every node,
+        but each ancestor matrix is multiplied exactly once, so sibling
+        nodes share the work for their common ancestors.
 
-        return pose
+        Returns
+        -------
+        poses : dict of :class:`Node` to (4,4) float
+            A map from each node in the scene to its world-frame pose.
+            The returned arrays are the caller's to mutate; they never
+            alias the cache.
+        """
+        poses = {}
+        stack = [(node, np.eye(4), ()) for node in self.nodes
+                 if self._parent[node] == 'world']
+        while stack:
+            node, parent_pose, parent_versions = stack.pop()
+            pose = np.dot(parent_pose, node.matrix)
+            versions = (node._tf_version,) + parent_versions
+            poses[node] = pose.copy()
+            self._pose_cache[node] = (pose, versions)
+            for child in node.children:
+                stack.append((child, pose, versions))
+        return poses
 
     def set_pose(self, node, pose):
         """Set the local-frame pose of a node in the scene.
@@ -476,80 +604,228 @@ class Scene(object):
         if node not in self.nodes:
             raise ValueError('Node must already be in scene')
         node._matrix = pose
-        if node.mesh is not None:
+        node._tf_version += 1
+
+        # Invalidate cached world poses for the moved subtree
+        stack = [node]
+        mesh_nodes = []
+        while stack:
+            n = stack.pop()
+            self._pose_cache.pop(n, None)
+            if n.mesh is not None:
+                mesh_nodes.append(n)
+            stack.extend(n.children)
+
+        if len(mesh_nodes) > 0 and self._bounds is not None:
+            # A move is O(1) unless one of the moved AABBs defined the
+            # scene boundary, in which case the bounds may shrink and
+            # only a full rebuild gives the right answer
+            for n in mesh_nodes:
+                old = self._node_world_aabb.get(n)
+                if (old is None or
+                        np.any(old[0] <= self._bounds[0]) or
+                        np.any(old[1] >= self._bounds[1])):
+                    self._bounds = None
+                    break
+            if self._bounds is not None:
+                for n in mesh_nodes:
+                    aabb = self._compute_node_world_aabb(n)
+                    self._node_world_aabb[n] = aabb
+                    self._bounds = np.array([
+                        np.minimum(self._bounds[0], aabb[0]),
+                        np.maximum(self._bounds[1], aabb[1])
+                    ])
+
+    def replace_node_object(self, node, obj):
+        """Swap the object attached to a node in place.
+
+        Keeps the node's pose and children intact while re-keying the
+        scene's object indexes, so :meth:`get_nodes` and
+        :meth:`remove_node` continue to work after the swap.
+
+        Parameters
+        ----------
+        node : :class:`Node`
+            The node whose object is to be replaced. Must already be in
+            the scene.
+        obj : :class:`Mesh`, :class:`Light`, or :class:`Camera`
+            The replacement object. Must be of the same kind as the
+            object currently attached to the node.
+        """
+        if node not in self.nodes:
+            raise ValueError('Node must already be in scene')
+        if isinstance(obj, Mesh):
+            old = node.mesh
+        elif isinstance(obj, Light):
+            old = node.light
+        elif isinstance(obj, Camera):
+            old = node.camera
+        else:
+            raise TypeError('Unrecognized object type')
+        if old is None:
+            raise ValueError('Node has no object of this kind to replace')
+        if old is obj:
+            return
+
+        # Re-key the object indexes from the old object to the new one
+        self._obj_to_nodes[old].remove(node)
+        if len(self._obj_to_nodes[old]) == 0:
+            self._obj_to_nodes.pop(old)
+        self._obj_to_nodes[obj].add(node)
+        if old.name is not None:
+            self._obj_name_to_nodes[old.name].remove(node)
+            if len(self._obj_name_to_nodes[old.name]) == 0:
+                self._obj_name_to_nodes.pop(old.name)
+        if obj.name is not None:
+            self._obj_name_to_nodes[obj.name].add(node)
+
+        if isinstance(obj, Mesh):
+            node.mesh = obj
+            # The cached world AABB belongs to the old mesh
+            self._node_world_aabb.pop(node, None)
             self._bounds = None
+        elif isinstance(obj, Light):
+            if obj._kind != old._kind:
+                self._light_sets[old._kind].remove(node)
+                self._light_sets[obj._kind].add(node)
+            node.light = obj
+        else:
+            node.camera = obj
 
     def clear(self):
         """Clear out all nodes to form an empty scene.
         """
         self._nodes = set()
 
-        self._name_to_nodes = {}
-        self._obj_to_nodes = {}
-        self._obj_name_to_nodes = {}
+        self._name_to_nodes = defaultdict(set)
+        self._obj_to_nodes = defaultdict(set)
+        self._obj_name_to_nodes = defaultdict(set)
         self._mesh_nodes = set()
+        self._mesh_nodes_list = []
+        self._mesh_nodes_idx = {}
         self._point_light_nodes = set()
         self._spot_light_nodes = set()
         self._directional_light_nodes = set()
+        self._light_sets = {
+            'point': self._point_light_nodes,
+            'spot': self._spot_light_nodes,
+            'directional': self._directional_light_nodes
+        }
         self._camera_nodes = set()
         self._main_camera_node = None
         self._bounds = None
+        self._node_world_aabb = {}
 
         # Transform tree
-        self._digraph = nx.DiGraph()
-        self._digraph.add_node('world')
+        self._parent = {}
         self._path_cache = {}
+        self._pose_cache = {}
 
-    def _remove_node(self, node):
-        """Remove a node and all its children from the scene.
+    def _compute_node_world_aabb(self, node):
+        """Compute the world-frame AABB of a single mesh node.
 
         Parameters
         ----------
         node : :class:`Node`
-            The node to be removed.
+            The mesh node to compute the AABB of.
+
+        Returns
+        -------
+        aabb : (2,3) float
+            The world-frame axis-aligned bounds of the node's mesh.
         """
+        pose = self.get_pose(node)
+        corners_local = node.mesh.corners
+        if not np.all(np.isfinite(corners_local)):
+            # Degenerate (empty) mesh -- its inverted infinite bounds
+            # are a no-op under union, so pass them through untouched
+            return np.array(node.mesh.bounds)
+        # (8,3) @ (3,3) keeps both operands contiguous and avoids the
+        # two transposes of rotating column vectors
+        corners_world = corners_local @ pose[:3,:3].T + pose[:3,3]
+        return np.array([np.min(corners_world, axis=0),
+                         np.max(corners_world, axis=0)])
+
+    def _subtree_has_mesh(self, node):
+        """Check whether a node or any of its descendants carries a mesh.
 
-        # Remove self from nodes
-        self.nodes.remove(node)
+        Parameters
+        ----------
+        node : :class:`Node`
+            The root of the subtree to be checked.
 
-        # Remove children
-        for child in node.children:
-            self._remove_node(child)
+        Returns
+        -------
+        has_mesh : bool
+            True if any node in the subtree has a mesh.
+        """
+        stack = [node]
+        while stack:
+            n = stack.pop()
+            if n.mesh is not None:
+                return True
+            stack.extend(n.children)
+        return False
 
-        # Remove self from the graph
-        self._digraph.remove_node(node)
+    def _remove_node(self, node):
+        """Remove a node and all its children from the scene.
 
-        # Remove from maps
-        if node.name in self._name_to_nodes:
-            self._name_to_nodes[node.name].remove(node)
-            if len(self._name_to_nodes[node.name]) == 0:
-                self._name_to_nodes.pop(node.name)
-        for obj in [node.mesh, node.camera, node.light]:
-            if obj is None:
-                continue
-            self._obj_to_nodes[obj].remove(node)
-            if len(self._obj_to_nodes[obj]) == 0:
-                self._obj_to_nodes.pop(obj)
-            if obj.name is not None:
-                self._obj_name_to_nodes[obj.name].remove(node)
-                if len(self._obj_name_to_nodes[obj.name]) == 0:
-                    self._obj_name_to_nodes.pop(obj.name)
-        if node.mesh is not None:
-            self._mesh_nodes.remove(node)
-        if node.light is not None:
-            if isinstance(node.light, PointLight):
-                self._point_light_nodes.remove(node)
-            if isinstance(node.light, SpotLight):
-                self._spot_light_nodes.remove(node)
-            if isinstance(node.light, DirectionalLight):
-                self._directional_light_nodes.remove(node)
-        if node.camera is not None:
-            self._camera_nodes.remove(node)
-            if self._main_camera_node == node:
-                if len(self._camera_nodes) > 0:
-                    self._main_camera_node = next(iter(self._camera_nodes))
-                else:
-                    self._main_camera_node = None
+        Parameters
+        ----------
+        node : :class:`Node`
+            The node to be removed.
+        """
+
+        # Collect the subtree with an explicit stack to avoid Python
+        # recursion overhead and stack limits on deep hierarchies
+        stack = [node]
+        subtree = []
+        while stack:
+            n = stack.pop()
+            subtree.append(n)
+            stack.extend(n.children)
+
+        for n in subtree:
+            # Remove node from nodes
+            self.nodes.remove(n)
+
+            # Remove node from the transform tree
+            del self._parent[n]
+
+            # Remove from maps
+            if n.name is not None:
+                self._name_to_nodes[n.name].remove(n)
+                if len(self._name_to_nodes[n.name]) == 0:
+                    self._name_to_nodes.pop(n.name)
+            for obj in [n.mesh, n.camera, n.light]:
+                if obj is None:
+                    continue
+                self._obj_to_nodes[obj].remove(n)
+                if len(self._obj_to_nodes[obj]) == 0:
+                    self._obj_to_nodes.pop(obj)
+                if obj.name is not None:
+                    self._obj_name_to_nodes[obj.name].remove(n)
+                    if len(self._obj_name_to_nodes[obj.name]) == 0:
+                        self._obj_name_to_nodes.pop(obj.name)
+            if n.mesh is not None:
+                self._mesh_nodes.remove(n)
+                # Swap-with-last so list removal stays O(1)
+                idx = self._mesh_nodes_idx.pop(n)
+                last = self._mesh_nodes_list.pop()
+                if last is not n:
+                    self._mesh_nodes_list[idx] = last
+                    self._mesh_nodes_idx[last] = idx
+            if n.light is not None:
+                self._light_sets[n.light._kind].remove(n)
+            if n.camera is not None:
+                self._camera_nodes.remove(n)
+                if self._main_camera_node == n:
+                    if len(self._camera_nodes) > 0:
+                        self._main_camera_node = next(
+                            iter(self._camera_nodes)
+                        )
+                    else:
+                        self._main_camera_node = None
 
     @staticmethod
     def from_trimesh_scene(trimesh_scene,
@@ -577,9 +853,13 @@ class Scene(object):
         # create the pyrender scene object
         scene_pr = Scene(bg_color=bg_color, ambient_light=ambient_light)
 
-        # add every node with geometry to the pyrender scene
+        # add every node with geometry to the pyrender scene in one
+        # bulk insertion rather than one cache-trashing add per node
+        nodes = []
         for node in trimesh_scene.graph.nodes_geometry:
             pose, geom_name = trimesh_scene.graph[node]
-            scene_pr.add(geometries[geom_name], pose=pose)
+            nodes.append((Node(matrix=pose, mesh=geometries[geom_name]),
+                          None))
+        scene_pr.add_nodes_bulk(nodes)
 
         return scene_pr
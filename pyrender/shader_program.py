@@ -8,6 +8,26 @@ import OpenGL
 from OpenGL.GL import *
 from OpenGL.GL import shaders as gl_shader_utils
 
+_IFDEF_RE = re.compile(
+    '#ifdef\\s+([a-zA-Z_][a-zA-Z_0-9]*)\\s*$', re.MULTILINE
+)
+_IFNDEF_RE = re.compile(
+    '#ifndef\\s+([a-zA-Z_][a-zA-Z_0-9]*)\\s*$', re.MULTILINE
+)
+
+# Compiled define-substitution patterns, keyed on the define names so
+# shader permutations sharing a define set share one pattern
+_DEFINE_RE_CACHE = {}
+
+# UTF-8-encoded uniform names, shared across all program permutations so
+# first-time location queries skip PyOpenGL's string marshalling
+_NAME_BYTES_CACHE = {}
+
+# Raw shader sources keyed on (filename, mtime), so the many program
+# permutations built from one file read it from disk only once while
+# still picking up on-disk edits
+_SOURCE_CACHE = {}
+
 
 class ShaderProgramCache(object):
     """A cache for shader programs.
@@ -53,9 +73,7 @@ class ShaderProgramCache(object):
             _, name = os.path.split(fn)
             shader_names.append(name)
         cid = OpenGL.contextdata.getContext()
-        key = tuple([cid] + sorted(
-            [(s,1) for s in shader_names] + [(d, defines[d]) for d in defines]
-        ))
+        key = (cid, frozenset(shader_names), frozenset(defines.items()))
 
         if key not in self._program_cache:
             shader_filenames = [
@@ -106,6 +124,22 @@ class ShaderProgram(object):
         self._program_id = None
         self._vao_id = None  # PYOPENGL BUG
 
+        # Uniform locations never change after link, so cache them
+        # rather than asking the driver on every set_uniform call
+        self._loc_cache = {}
+
+        # Shadow copies of the last-uploaded uniform values, so repeat
+        # uploads of unchanged data can skip the driver entirely
+        self._uniform_shadow = {}
+
+        # Per-uniform (gl_func, cast_dtype, is_matrix) dispatch decisions,
+        # resolved once on first use instead of re-classified per call
+        self._dispatch_cache = {}
+
+        # Reusable per-uniform cast buffers, so dtype conversions don't
+        # allocate a fresh array on every upload
+        self._scratch = {}
+
         # DEBUG
         # self._unif_map = {}
 
@@ -135,6 +169,8 @@ class ShaderProgram(object):
 
         # Compile program
         self._program_id = gl_shader_utils.compileProgram(*shader_ids)
+        self._loc_cache = {}
+        self._uniform_shadow = {}
 
         # Unbind empty VAO PYOPENGL BUG
         glBindVertexArray(0)
@@ -148,12 +184,16 @@ class ShaderProgram(object):
             glDeleteVertexArrays(1, [self._vao_id])
             self._program_id = None
             self._vao_id = None
+            self._loc_cache = {}
+            self._uniform_shadow = {}
 
     def _load(self, shader_filename):
-        path, _ = os.path.split(shader_filename)
-
-        with open(shader_filename) as f:
-            text = f.read()
+        key = (shader_filename, os.path.getmtime(shader_filename))
+        text = _SOURCE_CACHE.get(key)
+        if text is None:
+            with open(shader_filename) as f:
+                text = f.read()
+            _SOURCE_CACHE[key] = text
 
         def ifdef(matchobj):
             if matchobj.group(1) in self.defines:
@@ -167,18 +207,22 @@ class ShaderProgram(object):
             else:
                 return '#if 1'
 
-        ifdef_regex = re.compile(
-            '#ifdef\\s+([a-zA-Z_][a-zA-Z_0-9]*)\\s*$', re.MULTILINE
-        )
-        ifndef_regex = re.compile(
-            '#ifndef\\s+([a-zA-Z_][a-zA-Z_0-9]*)\\s*$', re.MULTILINE
-        )
-        text = re.sub(ifdef_regex, ifdef, text)
-        text = re.sub(ifndef_regex, ifndef, text)
-
-        for define in self.defines:
-            value = str(self.defines[define])
-            text = text.replace(define, value)
+        text = _IFDEF_RE.sub(ifdef, text)
+        text = _IFNDEF_RE.sub(ifndef, text)
+
+        if self.defines:
+            # Substitute all defines in one pass; the word boundaries
+            # keep one define from matching inside a longer one
+            define_key = frozenset(self.defines)
+            define_regex = _DEFINE_RE_CACHE.get(define_key)
+            if define_regex is None:
+                define_regex = re.compile(
+                    '\\b(' + '|'.join(map(re.escape, self.defines)) + ')\\b'
+                )
+                _DEFINE_RE_CACHE[define_key] = define_regex
+            text = define_regex.sub(
+                lambda m: str(self.defines[m.group(1)]), text
+            )
 
         return text
 
@@ -200,6 +244,11 @@ class ShaderProgram(object):
         """
         self._remove_from_context()
 
+    # TODO: pack the per-draw uniforms into a single std140 UBO updated
+    # with one glBufferSubData instead of many glUniform* calls. Needs
+    # coordinated edits to every shader in shaders/, since they all
+    # declare loose uniforms; the location/shadow/dispatch caches above
+    # recover most of the CPU cost in the meantime.
     def set_uniform(self, name, value, unsigned=False):
         """Set a uniform value in the current shader program.
 
@@ -212,51 +261,79 @@ class ShaderProgram(object):
         unsigned : bool
             If True, ints will be treated as unsigned values.
         """
-        try:
-            # DEBUG
-            # self._unif_map[name] = 1, (1,)
-            loc = glGetUniformLocation(self._program_id, name)
-
-            if loc == -1:
-                raise ValueError('Invalid shader variable: {}'.format(name))
-
-            if isinstance(value, np.ndarray):
-                # DEBUG
-                # self._unif_map[name] = value.size, value.shape
+        loc = self._loc_cache.get(name)
+        if loc is None:
+            name_bytes = _NAME_BYTES_CACHE.get(name)
+            if name_bytes is None:
+                name_bytes = name.encode('utf-8') + b'\0'
+                _NAME_BYTES_CACHE[name] = name_bytes
+            loc = glGetUniformLocation(self._program_id, name_bytes)
+            self._loc_cache[name] = loc
+
+        # Uniforms the GLSL compiler optimized away resolve to -1;
+        # skip them rather than uploading to an invalid location
+        if loc == -1:
+            return
+
+        # Skip the upload entirely if this value was already uploaded
+        if isinstance(value, np.ndarray):
+            shadow = value.tobytes()
+        else:
+            shadow = value
+        if self._uniform_shadow.get(name) == shadow:
+            return
+
+        if isinstance(value, np.ndarray):
+            entry = self._dispatch_cache.get(name)
+            if entry is None:
                 if value.ndim == 1:
                     if (np.issubdtype(value.dtype, np.unsignedinteger) or
                             unsigned):
-                        dtype = 'u'
-                        value = value.astype(np.uint32)
+                        dtype = np.uint32
+                        func = self._FUNC_MAP[(value.shape[0], 'u')]
                     elif np.issubdtype(value.dtype, np.integer):
-                        dtype = 'i'
-                        value = value.astype(np.int32)
+                        dtype = np.int32
+                        func = self._FUNC_MAP[(value.shape[0], 'i')]
                     else:
-                        dtype = 'f'
-                        value = value.astype(np.float32)
-                    self._FUNC_MAP[(value.shape[0], dtype)](loc, 1, value)
+                        dtype = np.float32
+                        func = self._FUNC_MAP[(value.shape[0], 'f')]
+                    entry = (func, dtype, False)
                 else:
-                    self._FUNC_MAP[(value.shape[0], value.shape[1])](
-                        loc, 1, GL_TRUE, value
-                    )
-
-            # Call correct uniform function
-            elif isinstance(value, float):
-                glUniform1f(loc, value)
-            elif isinstance(value, int):
-                if unsigned:
-                    glUniform1ui(loc, value)
-                else:
-                    glUniform1i(loc, value)
-            elif isinstance(value, bool):
-                if unsigned:
-                    glUniform1ui(loc, int(value))
-                else:
-                    glUniform1i(loc, int(value))
+                    func = self._FUNC_MAP[
+                        (value.shape[0], value.shape[1])
+                    ]
+                    entry = (func, None, True)
+                self._dispatch_cache[name] = entry
+            func, dtype, is_matrix = entry
+            if is_matrix:
+                func(loc, 1, GL_TRUE, value)
+            elif value.dtype == dtype:
+                func(loc, 1, value)
+            else:
+                buf = self._scratch.get(name)
+                if buf is None or buf.shape != value.shape:
+                    buf = np.empty(value.shape, dtype=dtype)
+                    self._scratch[name] = buf
+                np.copyto(buf, value, casting='unsafe')
+                func(loc, 1, buf)
+
+        # Call correct uniform function
+        elif isinstance(value, float):
+            glUniform1f(loc, value)
+        elif isinstance(value, int):
+            if unsigned:
+                glUniform1ui(loc, value)
             else:
-                raise ValueError('Invalid data type')
-        except Exception:
-            pass
+                glUniform1i(loc, value)
+        elif isinstance(value, bool):
+            if unsigned:
+                glUniform1ui(loc, int(value))
+            else:
+                glUniform1i(loc, int(value))
+        else:
+            raise ValueError('Invalid data type')
+
+        self._uniform_shadow[name] = shadow
 
     _FUNC_MAP = {
         (1,'u'): glUniform1uiv,
@@ -10,6 +10,30 @@ from OpenGL.GL import *
 from .utils import format_texture_source
 from .sampler import Sampler
 
+_CHANNELS_TO_FMT = {
+    'R': GL_RED,
+    'RG': GL_RG,
+    'GB': GL_RG,
+    'RGB': GL_RGB,
+    'RGBA': GL_RGBA,
+}
+_BORDER_U8 = 255 * np.ones(4, dtype=np.uint8)
+_BORDER_F32 = np.ones(4, dtype=np.float32)
+
+# Sized internal formats for immutable storage allocation
+_SIZED_INTERNAL_FMT = {
+    (GL_RED, GL_UNSIGNED_BYTE): GL_R8,
+    (GL_RED, GL_FLOAT): GL_R32F,
+    (GL_RG, GL_UNSIGNED_BYTE): GL_RG8,
+    (GL_RG, GL_FLOAT): GL_RG32F,
+    (GL_RGB, GL_UNSIGNED_BYTE): GL_RGB8,
+    (GL_RGB, GL_FLOAT): GL_RGB32F,
+    (GL_RGBA, GL_UNSIGNED_BYTE): GL_RGBA8,
+    (GL_RGBA, GL_FLOAT): GL_RGBA32F,
+    (GL_DEPTH_COMPONENT, GL_UNSIGNED_BYTE): GL_DEPTH_COMPONENT24,
+    (GL_DEPTH_COMPONENT, GL_FLOAT): GL_DEPTH_COMPONENT32F,
+}
+
 
 class Texture(object):
     """A texture and its sampler.
@@ -153,7 +177,9 @@ class Texture(object):
         if self._is_transparent is None:
             self._is_transparent = False
             if self.source_channels == 'RGBA' and self.source is not None:
-                if np.any(self.source[:,:,3] < cutoff):
+                # min() reduces without materializing a boolean mask
+                # the size of the whole texture
+                if self.source[:,:,3].min() < cutoff:
                     self._is_transparent = True
         return self._is_transparent
 
@@ -170,15 +196,7 @@ class Texture(object):
         if self._texid is not None:
             raise ValueError('Texture already loaded into OpenGL context')
 
-        fmt = GL_DEPTH_COMPONENT
-        if self.source_channels == 'R':
-            fmt = GL_RED
-        elif self.source_channels == 'RG' or self.source_channels == 'GB':
-            fmt = GL_RG
-        elif self.source_channels == 'RGB':
-            fmt = GL_RGB
-        elif self.source_channels == 'RGBA':
-            fmt = GL_RGBA
+        fmt = _CHANNELS_TO_FMT.get(self.source_channels, GL_DEPTH_COMPONENT)
 
         # Generate the OpenGL texture
         self._texid = glGenTextures(1)
@@ -189,15 +207,65 @@ class Texture(object):
         width = self.width
         height = self.height
         if self.source is not None:
-            data = np.ascontiguousarray(np.flip(self.source, axis=0).flatten())
+            # A single ascontiguousarray on the reversed view does the
+            # row flip in one C-level copy, with no flatten pass
+            data = np.ascontiguousarray(self.source[::-1])
             width = self.source.shape[1]
             height = self.source.shape[0]
 
         # Bind texture and generate mipmaps
-        glTexImage2D(
-            self.tex_type, 0, fmt, width, height, 0, fmt,
-            self.data_format, data
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        # glTexStorage2D rejects zero dimensions, which font glyphs
+        # without bitmaps (e.g. the space character) legitimately have
+        use_storage = (
+            bool(glTexStorage2D) and
+            (fmt, self.data_format) in _SIZED_INTERNAL_FMT and
+            bool(width) and bool(height)
         )
+        if use_storage:
+            # Immutable storage declares the full mipmap chain up
+            # front, which lets the driver skip completeness checks
+            # on every subsequent bind
+            levels = 1
+            if data is not None:
+                levels = int(max(width, height)).bit_length()
+            glTexStorage2D(
+                self.tex_type, levels,
+                _SIZED_INTERNAL_FMT[(fmt, self.data_format)],
+                width, height
+            )
+        if data is not None and data.nbytes > 0 and bool(glGenBuffers):
+            # Stage the pixels in a pixel-unpack buffer so the driver
+            # can DMA them in the background instead of blocking the
+            # CPU inside glTexImage2D
+            pbo = glGenBuffers(1)
+            glBindBuffer(GL_PIXEL_UNPACK_BUFFER, pbo)
+            glBufferData(
+                GL_PIXEL_UNPACK_BUFFER, data.nbytes, data, GL_STREAM_DRAW
+            )
+            if use_storage:
+                glTexSubImage2D(
+                    self.tex_type, 0, 0, 0, width, height, fmt,
+                    self.data_format, None
+                )
+            else:
+                glTexImage2D(
+                    self.tex_type, 0, fmt, width, height, 0, fmt,
+                    self.data_format, None
+                )
+            glBindBuffer(GL_PIXEL_UNPACK_BUFFER, 0)
+            glDeleteBuffers(1, [pbo])
+        elif use_storage:
+            if data is not None:
+                glTexSubImage2D(
+                    self.tex_type, 0, 0, 0, width, height, fmt,
+                    self.data_format, data
+                )
+        else:
+            glTexImage2D(
+                self.tex_type, 0, fmt, width, height, 0, fmt,
+                self.data_format, data
+            )
         if self.source is not None:
             glGenerateMipmap(self.tex_type)
 
@@ -222,9 +290,9 @@ class Texture(object):
 
         glTexParameteri(self.tex_type, GL_TEXTURE_WRAP_S, self.sampler.wrapS)
         glTexParameteri(self.tex_type, GL_TEXTURE_WRAP_T, self.sampler.wrapT)
-        border_color = 255 * np.ones(4).astype(np.uint8)
+        border_color = _BORDER_U8
         if self.data_format == GL_FLOAT:
-            border_color = np.ones(4).astype(np.float32)
+            border_color = _BORDER_F32
         glTexParameterfv(
             self.tex_type, GL_TEXTURE_BORDER_COLOR,
             border_color
@@ -1,8 +1,66 @@
 """Trackball class for 3D manipulation of viewpoints.
 """
+import math
+
 import numpy as np
 
-import trimesh.transformations as transformations
+try:
+    from scipy.spatial.transform import Rotation as _Rotation
+except ImportError:
+    _Rotation = None
+
+
+def _rotation_3x3(angle, axis):
+    """Build the 3x3 rotation of `angle` radians about `axis` via
+    Rodrigues' formula.
+    """
+    ux, uy, uz = axis
+    n = math.sqrt(ux * ux + uy * uy + uz * uz)
+    ux, uy, uz = ux / n, uy / n, uz / n
+    c = math.cos(angle)
+    s = math.sin(angle)
+    t = 1.0 - c
+
+    r = np.empty((3,3), dtype=np.float32)
+    r[0,0] = c + t * ux * ux
+    r[0,1] = t * ux * uy - s * uz
+    r[0,2] = t * ux * uz + s * uy
+    r[1,0] = t * ux * uy + s * uz
+    r[1,1] = c + t * uy * uy
+    r[1,2] = t * uy * uz - s * ux
+    r[2,0] = t * ux * uz - s * uy
+    r[2,1] = t * uy * uz + s * ux
+    r[2,2] = c + t * uz * uz
+    return r
+
+
+def _embed_rotation(r, point):
+    """Lift a 3x3 rotation about `point` into a 4x4 transform.
+    """
+    m = np.empty((4,4), dtype=np.float32)
+    m[:3,:3] = r
+    m[:3,3] = point - r.dot(point)
+    m[3,:3] = 0.0
+    m[3,3] = 1.0
+    return m
+
+
+def _affine_mul(a, b):
+    """Multiply two affine 4x4s, computing only the top 3x4 block.
+    """
+    m = np.empty((4,4), dtype=np.float32)
+    m[:3,:3] = a[:3,:3].dot(b[:3,:3])
+    m[:3,3] = a[:3,:3].dot(b[:3,3]) + a[:3,3]
+    m[3,:3] = 0.0
+    m[3,3] = 1.0
+    return m
+
+
+def _rotation_matrix(angle, axis, point):
+    """Build a 4x4 rotation of `angle` radians about `axis` through
+    `point` via Rodrigues' formula.
+    """
+    return _embed_rotation(_rotation_3x3(angle, axis), point)
 
 
 class Trackball(object):
@@ -38,6 +96,10 @@ class Trackball(object):
         self._size = np.array(size)
         self._scale = float(scale)
 
+        # Poses are kept contiguous float32 internally so per-event
+        # matmuls and downstream GL consumers avoid dtype conversions
+        pose = np.ascontiguousarray(pose, dtype=np.float32)
+        target = np.ascontiguousarray(target, dtype=np.float32)
         self._pose = pose
         self._n_pose = pose
 
@@ -46,6 +108,18 @@ class Trackball(object):
 
         self._state = Trackball.STATE_ROTATE
 
+        # Bumped whenever the pose changes, so consumers polling the
+        # pose every frame can skip work while the trackball is idle
+        self._pose_version = 0
+
+        # Copied instead of rebuilt for each translation event
+        self._I4 = np.eye(4, dtype=np.float32)
+
+        # Memoized fixed-axis rotation delta for rotate(); reused across
+        # animation ticks while angle, axis, and target stay the same
+        self._rot_delta = None
+        self._rot_delta_key = None
+
     @property
     def pose(self):
         """autolab_core.RigidTransform : The current camera-to-world pose.
@@ -82,7 +156,7 @@ class Trackball(object):
         point : (2,) int
             The x and y pixel coordinates of the mouse press.
         """
-        self._pdown = np.array(point, dtype=np.float32)
+        self._pdown = (float(point[0]), float(point[1]))
         self._pose = self._n_pose
         self._target = self._n_target
 
@@ -96,44 +170,44 @@ class Trackball(object):
             This will compute a movement for the trackball with the relative
             motion between this point and the one marked by down().
         """
-        point = np.array(point, dtype=np.float32)
-        dx, dy = point - self._pdown
-        mindim = 0.3 * np.min(self._size)
+        px, py = float(point[0]), float(point[1])
+        dx = px - self._pdown[0]
+        dy = py - self._pdown[1]
+        mindim = 0.3 * min(self._size[0], self._size[1])
 
         target = self._target
-        x_axis = self._pose[:3,0].flatten()
-        y_axis = self._pose[:3,1].flatten()
-        z_axis = self._pose[:3,2].flatten()
-        eye = self._pose[:3,3].flatten()
+        x_axis = self._pose[:3,0]
+        y_axis = self._pose[:3,1]
+        z_axis = self._pose[:3,2]
+        eye = self._pose[:3,3]
 
         # Interpret drag as a rotation
         if self._state == Trackball.STATE_ROTATE:
             x_angle = -dx / mindim
-            x_rot_mat = transformations.rotation_matrix(
-                x_angle, y_axis, target
-            )
-
             y_angle = dy / mindim
-            y_rot_mat = transformations.rotation_matrix(
-                y_angle, x_axis, target
+
+            # Both rotations share the same fixed point, so compose
+            # them as 3x3s and lift the product into one 4x4
+            rot = _rotation_3x3(y_angle, x_axis).dot(
+                _rotation_3x3(x_angle, y_axis)
             )
+            rot_mat = _embed_rotation(rot, target)
 
-            self._n_pose = y_rot_mat.dot(x_rot_mat.dot(self._pose))
+            self._n_pose = _affine_mul(rot_mat, self._pose)
 
         # Interpret drag as a roll about the camera axis
         elif self._state == Trackball.STATE_ROLL:
-            center = self._size / 2.0
-            v_init = self._pdown - center
-            v_curr = point - center
-            v_init = v_init / np.linalg.norm(v_init)
-            v_curr = v_curr / np.linalg.norm(v_curr)
+            cx = 0.5 * self._size[0]
+            cy = 0.5 * self._size[1]
 
-            theta = (-np.arctan2(v_curr[1], v_curr[0]) +
-                     np.arctan2(v_init[1], v_init[0]))
+            # atan2 is scale-invariant, so the vectors from the window
+            # center need no normalization first
+            theta = (-math.atan2(py - cy, px - cx) +
+                     math.atan2(self._pdown[1] - cy, self._pdown[0] - cx))
 
-            rot_mat = transformations.rotation_matrix(theta, z_axis, target)
+            rot_mat = _rotation_matrix(theta, z_axis, target)
 
-            self._n_pose = rot_mat.dot(self._pose)
+            self._n_pose = _affine_mul(rot_mat, self._pose)
 
         # Interpret drag as a camera pan in view plane
         elif self._state == Trackball.STATE_PAN:
@@ -142,22 +216,23 @@ class Trackball(object):
 
             translation = dx * x_axis + dy * y_axis
             self._n_target = self._target + translation
-            t_tf = np.eye(4)
+            t_tf = self._I4.copy()
             t_tf[:3,3] = translation
-            self._n_pose = t_tf.dot(self._pose)
+            self._n_pose = _affine_mul(t_tf, self._pose)
 
         # Interpret drag as a zoom motion
         elif self._state == Trackball.STATE_ZOOM:
-            radius = np.linalg.norm(eye - target)
-            ratio = 0.0
-            if dy > 0:
-                ratio = np.exp(abs(dy) / (0.5 * self._size[1])) - 1.0
-            elif dy < 0:
-                ratio = 1.0 - np.exp(dy / (0.5 * (self._size[1])))
-            translation = -np.sign(dy) * ratio * radius * z_axis
-            t_tf = np.eye(4)
+            d = eye - target
+            radius = math.sqrt(d.dot(d))
+            # Both signs of dy reduce to the same expression once the
+            # sign is folded into the exponential's argument
+            ratio = 1.0 - math.exp(dy / (0.5 * self._size[1]))
+            translation = ratio * radius * z_axis
+            t_tf = self._I4.copy()
             t_tf[:3,3] = translation
-            self._n_pose = t_tf.dot(self._pose)
+            self._n_pose = _affine_mul(t_tf, self._pose)
+
+        self._pose_version += 1
 
     def scroll(self, clicks):
         """Zoom using a mouse scroll wheel motion.
@@ -177,21 +252,18 @@ class Trackball(object):
         elif clicks < 0:
             mult = (1.0 / ratio)**abs(clicks)
 
-        z_axis = self._n_pose[:3,2].flatten()
-        eye = self._n_pose[:3,3].flatten()
-        radius = np.linalg.norm(eye - target)
-        translation = (mult * radius - radius) * z_axis
-        t_tf = np.eye(4)
-        t_tf[:3,3] = translation
-        self._n_pose = t_tf.dot(self._n_pose)
-
-        z_axis = self._pose[:3,2].flatten()
-        eye = self._pose[:3,3].flatten()
-        radius = np.linalg.norm(eye - target)
-        translation = (mult * radius - radius) * z_axis
-        t_tf = np.eye(4)
-        t_tf[:3,3] = translation
-        self._pose = t_tf.dot(self._pose)
+        def apply_scroll(pose):
+            z_axis = pose[:3,2]
+            eye = pose[:3,3]
+            d = eye - target
+            radius = math.sqrt(d.dot(d))
+            t_tf = self._I4.copy()
+            t_tf[:3,3] = (mult * radius - radius) * z_axis
+            return _affine_mul(t_tf, pose)
+
+        self._n_pose = apply_scroll(self._n_pose)
+        self._pose = apply_scroll(self._pose)
+        self._pose_version += 1
 
     def rotate(self, azimuth, axis=None):
         """Rotate the trackball about the "Up" axis by azimuth radians.
@@ -203,14 +275,90 @@ class Trackball(object):
         """
         target = self._target
 
-        y_axis = self._n_pose[:3,1].flatten()
-        if axis is not None:
-            y_axis = axis
-        x_rot_mat = transformations.rotation_matrix(azimuth, y_axis, target)
-        self._n_pose = x_rot_mat.dot(self._n_pose)
+        def build_rotation(y_axis):
+            if _Rotation is not None:
+                u = np.asanyarray(y_axis, dtype=np.float64)
+                u = u / math.sqrt(u.dot(u))
+                rot = _Rotation.from_rotvec(azimuth * u).as_matrix()
+                return _embed_rotation(rot, target)
+            return _rotation_matrix(azimuth, y_axis, target)
 
-        y_axis = self._pose[:3,1].flatten()
         if axis is not None:
-            y_axis = axis
-        x_rot_mat = transformations.rotation_matrix(azimuth, y_axis, target)
-        self._pose = x_rot_mat.dot(self._pose)
+            # Fixed-axis rotations (the viewer's rotate animation) hit
+            # this every tick with the same arguments, so the delta
+            # matrix is built once and reused until they change
+            key = (azimuth, float(axis[0]), float(axis[1]), float(axis[2]),
+                   float(target[0]), float(target[1]), float(target[2]))
+            if key != self._rot_delta_key:
+                self._rot_delta = build_rotation(axis)
+                self._rot_delta_key = key
+            x_rot_mat = self._rot_delta
+            self._n_pose = _affine_mul(x_rot_mat, self._n_pose)
+            self._pose = _affine_mul(x_rot_mat, self._pose)
+        else:
+            # Axis defaults to each pose's own "Up" vector, which moves
+            # with the pose, so the delta must be rebuilt per pose
+            self._n_pose = _affine_mul(
+                build_rotation(self._n_pose[:3,1]), self._n_pose
+            )
+            self._pose = _affine_mul(
+                build_rotation(self._pose[:3,1]), self._pose
+            )
+        self._pose_version += 1
+
+    def apply_batch(self, transform, poses):
+        """Apply a single 4x4 transform to a stack of poses.
+
+        Parameters
+        ----------
+        transform : (4,4) float
+            The transform to apply.
+        poses : (n,4,4) float
+            The poses to transform.
+
+        Returns
+        -------
+        poses : (n,4,4) float
+            The transformed poses.
+        """
+        return np.matmul(transform, poses)
+
+    def rotate_batch(self, azimuths, axis=None):
+        """Build rotated copies of the current pose for a batch of
+        azimuths, without mutating the trackball.
+
+        Parameters
+        ----------
+        azimuths : (n,) float
+            The rotation angles about the axis, in radians.
+        axis : (3,) float, optional
+            The axis to rotate about. Defaults to the current "Up" axis.
+
+        Returns
+        -------
+        poses : (n,4,4) float
+            One rotated copy of the current pose per azimuth.
+        """
+        azimuths = np.asanyarray(azimuths, dtype=np.float64)
+        target = self._n_target
+        if axis is None:
+            axis = self._n_pose[:3,1]
+        u = np.asanyarray(axis, dtype=np.float64)
+        u = u / math.sqrt(u.dot(u))
+
+        # Vectorized Rodrigues: one rotation stack for all angles
+        c = np.cos(azimuths)
+        s = np.sin(azimuths)
+        uut = np.outer(u, u)
+        cross = np.array([[0.0, -u[2], u[1]],
+                          [u[2], 0.0, -u[0]],
+                          [-u[1], u[0], 0.0]])
+        rots = (c[:,None,None] * np.eye(3) +
+                (1.0 - c)[:,None,None] * uut +
+                s[:,None,None] * cross)
+
+        tfs = np.zeros((len(azimuths), 4, 4))
+        tfs[:,:3,:3] = rots
+        tfs[:,:3,3] = target - np.einsum('nij,j->ni', rots, target)
+        tfs[:,3,3] = 1.0
+        return np.matmul(tfs, self._n_pose)
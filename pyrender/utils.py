@@ -1,3 +1,5 @@
+import itertools
+
 import numpy as np
 from PIL import Image
 
@@ -5,6 +7,17 @@ from PIL import Image
 def format_color_vector(value, length):
     """Format a color vector.
     """
+    # Fast paths for already-formatted inputs, which dominate when many
+    # material parameters are formatted at scene load
+    if isinstance(value, np.ndarray):
+        if (value.dtype == np.float32 and value.shape == (length,) and
+                value.flags['C_CONTIGUOUS']):
+            return value
+    elif isinstance(value, (list, tuple)):
+        if (len(value) == length and
+                all(type(v) is float for v in value)):
+            return np.asarray(value, dtype=np.float32)
+
     if isinstance(value, int):
         value = value / 255.0
     if isinstance(value, float):
@@ -14,7 +27,10 @@ def format_color_vector(value, length):
     if isinstance(value, np.ndarray):
         value = value.squeeze()
         if np.issubdtype(value.dtype, np.integer):
-            value = (value / 255.0).astype(np.float32)
+            # Convert in float32 end-to-end instead of dividing in
+            # float64 and downcasting
+            value = value.astype(np.float32)
+            value *= np.float32(1.0 / 255.0)
         if value.ndim != 1:
             raise ValueError('Format vector takes only 1-D vectors')
         if length > value.shape[0]:
@@ -24,16 +40,32 @@ def format_color_vector(value, length):
     else:
         raise ValueError('Invalid vector data type')
 
-    return value.squeeze().astype(np.float32)
+    return np.ascontiguousarray(value.squeeze(), dtype=np.float32)
 
 
 def format_color_array(value, shape):
     """Format an array of colors.
     """
+    # Flatten large lists of per-vertex colors through fromiter, which
+    # is much faster than NumPy's generic Python-sequence reader
+    if (isinstance(value, list) and len(value) > 1024 and
+            isinstance(value[0], (list, tuple))):
+        n = len(value)
+        m = len(value[0])
+        if all(len(v) == m for v in value):
+            is_int = type(value[0][0]) is int
+            value = np.fromiter(
+                itertools.chain.from_iterable(value),
+                dtype=np.float32, count=n * m
+            ).reshape(n, m)
+            if is_int:
+                value *= np.float32(1.0 / 255.0)
+
     # Convert uint8 to floating
     value = np.asanyarray(value)
     if np.issubdtype(value.dtype, np.integer):
-        value = (value / 255.0).astype(np.float32)
+        value = value.astype(np.float32)
+        value *= np.float32(1.0 / 255.0)
 
     # Match up shapes
     if value.ndim == 1:
@@ -43,7 +75,7 @@ def format_color_array(value, shape):
         value = np.column_stack((value, np.ones((value.shape[0], nc))))
     elif value.shape[1] > shape[1]:
         value = value[:,:shape[1]]
-    return value.astype(np.float32)
+    return np.ascontiguousarray(value, dtype=np.float32)
 
 
 def format_texture_source(texture, target_channels='RGB'):
@@ -64,9 +96,13 @@ def format_texture_source(texture, target_channels='RGB'):
     # Format numpy arrays
     if isinstance(texture, np.ndarray):
         if np.issubdtype(texture.dtype, np.floating):
-            texture = np.array(texture * 255.0, dtype=np.uint8)
+            # Scale in float32 so float64 inputs don't allocate a
+            # double-width intermediate before the uint8 cast
+            texture = np.multiply(
+                texture, 255.0, dtype=np.float32
+            ).astype(np.uint8)
         elif np.issubdtype(texture.dtype, np.integer):
-            texture = texture.astype(np.uint8)
+            texture = texture.astype(np.uint8, copy=False)
         else:
             raise TypeError('Invalid type {} for texture'.format(
                 type(texture)
@@ -80,25 +116,33 @@ def format_texture_source(texture, target_channels='RGB'):
             texture = texture.squeeze()
         elif target_channels == 'RG':
             if texture.shape[2] == 1:
-                texture = np.repeat(texture, 2, axis=2)
+                tx = np.empty(texture.shape[:2] + (2,), dtype=np.uint8)
+                tx[...] = texture
+                texture = tx
             else:
-                texture = texture[:,:,(0,1)]
+                texture = texture[:,:,:2]
         elif target_channels == 'GB':
             if texture.shape[2] == 1:
-                texture = np.repeat(texture, 2, axis=2)
+                tx = np.empty(texture.shape[:2] + (2,), dtype=np.uint8)
+                tx[...] = texture
+                texture = tx
             elif texture.shape[2] > 2:
-                texture = texture[:,:,(1,2)]
+                texture = texture[:,:,1:3]
         elif target_channels == 'RGB':
             if texture.shape[2] == 1:
-                texture = np.repeat(texture, 3, axis=2)
+                tx = np.empty(texture.shape[:2] + (3,), dtype=np.uint8)
+                tx[...] = texture
+                texture = tx
             elif texture.shape[2] == 2:
                 raise ValueError('Cannot reformat 2-channel texture into RGB')
             else:
-                texture = texture[:,:,(0,1,2)]
+                texture = texture[:,:,:3]
         elif target_channels == 'RGBA':
             if texture.shape[2] == 1:
-                texture = np.repeat(texture, 4, axis=2)
-                texture[:,:,3] = 255
+                tx = np.empty(texture.shape[:2] + (4,), dtype=np.uint8)
+                tx[:,:,:3] = texture
+                tx[:,:,3] = 255
+                texture = tx
             elif texture.shape[2] == 2:
                 raise ValueError('Cannot reformat 2-channel texture into RGBA')
             elif texture.shape[2] == 3:
@@ -1,24 +1,27 @@
 """A pyglet-based interactive 3D scene viewer.
 """
 import copy
+from concurrent.futures import ThreadPoolExecutor
+import math
 import os
+import shutil
 import sys
-from threading import Thread, RLock
+import tempfile
+from threading import Thread, RLock, Lock, Event, local
 import time
 
 import imageio
 import numpy as np
 import OpenGL
+from OpenGL.GL import (
+    GL_BACK, GL_COLOR_BUFFER_BIT, GL_DRAW_FRAMEBUFFER, GL_NEAREST,
+    GL_READ_FRAMEBUFFER, GL_RGB8, GL_TEXTURE_2D, glBindFramebuffer,
+    glBindTexture, glBlitFramebuffer, glCopyTexImage2D, glDeleteFramebuffers,
+    glDeleteTextures, glFramebufferTexture2D, glGenFramebuffers,
+    glGenTextures, glReadBuffer, GL_COLOR_ATTACHMENT0, GL_FRAMEBUFFER
+)
 import trimesh
 
-try:
-    from Tkinter import Tk, tkFileDialog as filedialog
-except Exception:
-    try:
-        from tkinter import Tk, filedialog as filedialog
-    except Exception:
-        pass
-
 from .constants import (TARGET_OPEN_GL_MAJOR, TARGET_OPEN_GL_MINOR,
                         MIN_OPEN_GL_MAJOR, MIN_OPEN_GL_MINOR,
                         TEXT_PADDING, DEFAULT_SCENE_SCALE,
@@ -35,6 +38,135 @@ from pyglet import clock
 pyglet.options['shadow_window'] = False
 
 
+# Shared read-only defaults for light/node construction; every consumer
+# copies or converts, so no instance state aliases these
+_ONES3 = np.ones(3)
+_ONES3.setflags(write=False)
+_EYE4 = np.eye(4)
+_EYE4.setflags(write=False)
+
+
+class _RenderLock(object):
+    """A reentrant lock for scene updates whose draw side is free when
+    uncontended.
+
+    External updaters use ``acquire``/``release`` (or the context
+    manager) exactly like the RLock this replaces. The draw loop instead
+    brackets each frame with ``begin_draw``/``end_draw``: when no writer
+    is waiting it skips lock traffic entirely, and a writer that arrives
+    mid-frame blocks on an event until that frame completes, so writers
+    never overlap a render.
+    """
+
+    def __init__(self):
+        self._lock = RLock()
+        self._count_lock = Lock()
+        self._n_waiting = 0
+        self._frame_done = Event()
+        self._frame_done.set()
+        self._depth = local()
+
+    def acquire(self, blocking=True):
+        depth = getattr(self._depth, 'value', 0)
+        if depth == 0:
+            with self._count_lock:
+                self._n_waiting += 1
+            # Wait out any unlocked frame currently in flight
+            self._frame_done.wait()
+        acquired = self._lock.acquire(blocking)
+        if not acquired:
+            with self._count_lock:
+                self._n_waiting -= 1
+            return False
+        self._depth.value = depth + 1
+        return True
+
+    def release(self):
+        self._lock.release()
+        depth = self._depth.value - 1
+        self._depth.value = depth
+        if depth == 0:
+            with self._count_lock:
+                self._n_waiting -= 1
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+    def begin_draw(self):
+        """Enter a frame, locking only if a writer is waiting.
+
+        Returns
+        -------
+        locked : bool
+            Whether the frame holds the lock; pass this to ``end_draw``.
+        """
+        if self._n_waiting:
+            self._lock.acquire()
+            return True
+        self._frame_done.clear()
+        # A writer may have registered between the check and the clear;
+        # re-check so it cannot run concurrently with this frame
+        if self._n_waiting:
+            self._frame_done.set()
+            self._lock.acquire()
+            return True
+        return False
+
+    def end_draw(self, locked):
+        """Exit a frame entered with ``begin_draw``.
+        """
+        if locked:
+            self._lock.release()
+        else:
+            self._frame_done.set()
+
+
+class _FlagDict(dict):
+    """A dict of flags that runs a callback whenever a flag is written,
+    so that state derived from the flags can be invalidated.
+    """
+
+    def __init__(self, data, callback):
+        dict.__init__(self, data)
+        self._callback = callback
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, value)
+        self._callback()
+
+    def update(self, *args, **kwargs):
+        dict.update(self, *args, **kwargs)
+        self._callback()
+
+
+# Field-wise camera clones, cheaper than copy.copy's generic attribute
+# introspection and dispatched with a single type lookup
+_CAMERA_CLONERS = {
+    PerspectiveCamera: lambda c: PerspectiveCamera(
+        yfov=c.yfov, znear=c.znear, zfar=c.zfar,
+        aspectRatio=c.aspectRatio, name=c.name
+    ),
+    OrthographicCamera: lambda c: OrthographicCamera(
+        xmag=c.xmag, ymag=c.ymag, znear=c.znear, zfar=c.zfar, name=c.name
+    ),
+    IntrinsicsCamera: lambda c: IntrinsicsCamera(
+        fx=c.fx, fy=c.fy, cx=c.cx, cy=c.cy,
+        znear=c.znear, zfar=c.zfar, name=c.name
+    ),
+}
+
+
+def _clone_camera(camera):
+    cloner = _CAMERA_CLONERS.get(type(camera))
+    if cloner is not None:
+        return cloner(camera)
+    return copy.copy(camera)
+
+
 class Viewer(pyglet.window.Window):
     """An interactive viewer for 3D scenes.
 
@@ -164,6 +296,23 @@ class Viewer(pyglet.window.Window):
       Defaults to `False`.
     - ``caption``: `list of dict`, Text caption(s) to display on the viewer.
       Defaults to `None`.
+    - ``record_format``: `str`, The container used when recording -- one of
+      ``'gif'``, ``'mp4'``, or ``'webm'``. The video formats need the
+      ``imageio-ffmpeg`` package, encode much faster, and produce files an
+      order of magnitude smaller than GIF. Defaults to ``'gif'``.
+    - ``gif_palettesize``: `int`, The GIF palette size used when recording.
+      Defaults to `64`.
+    - ``gif_subrectangles``: `bool`, Whether the GIF encoder should diff
+      consecutive frames and emit partial updates. Worthwhile for sparse
+      UI-style captures, but costly for 3D scenes where most pixels change
+      each frame. Defaults to `False`.
+    - ``gif_quantizer``: `str`, The palette quantizer to use when recording,
+      either ``'wu'`` (fast) or ``'nq'`` (slower, higher quality).
+      Defaults to ``'wu'``.
+    - ``vsync``: `bool`, Whether buffer swaps wait for the display's
+      vertical retrace. Disabling it lowers input latency at the risk of
+      tearing. It is forced off while recording so capture throughput
+      isn't capped at the monitor refresh rate. Defaults to `True`.
 
     Note
     ----
@@ -173,6 +322,29 @@ class Viewer(pyglet.window.Window):
     :attr:`.Viewer.render_lock`, and release it  when your update is done.
     """
 
+    # Cycles for the 'w' and 'l' keys: (message, *flag values), stepped
+    # through with a single index instead of chained flag comparisons
+    _WIREFRAME_STATES = (
+        ('Flip Wireframe', True, False, False),
+        ('All Wireframe', False, True, False),
+        ('All Solid', False, False, True),
+        ('Default Wireframe', False, False, False),
+    )
+    _LIGHTING_STATES = (
+        ('Raymond Lighting', True, False),
+        ('Direct Lighting', False, True),
+        ('Default Lighting', False, False),
+    )
+
+    # tkinter pulls in a full Tcl/Tk interpreter, so it is imported
+    # lazily on the first save dialog and cached here
+    _tk_modules = None
+
+    # Valid flag names for classifying **kwargs, derived once from the
+    # default dicts on first construction
+    _RENDER_FLAG_KEYS = None
+    _VIEWER_FLAG_KEYS = None
+
     def __init__(self, scene, viewport_size=None,
                  render_flags=None, viewer_flags=None,
                  registered_keys=None, run_in_thread=False,
@@ -186,7 +358,7 @@ class Viewer(pyglet.window.Window):
             viewport_size = (640, 480)
         self._scene = scene
         self._viewport_size = viewport_size
-        self._render_lock = RLock()
+        self._render_lock = _RenderLock()
         self._is_active = False
         self._should_close = False
         self._run_in_thread = run_in_thread
@@ -206,7 +378,7 @@ class Viewer(pyglet.window.Window):
             'mouse_pressed': False,
             'rotate': False,
             'rotate_rate': np.pi / 3.0,
-            'rotate_axis': np.array([0.0, 0.0, 1.0]),
+            'rotate_axis': (0.0, 0.0, 1.0),
             'view_center': None,
             'record': False,
             'use_raymond_lighting': False,
@@ -219,43 +391,103 @@ class Viewer(pyglet.window.Window):
             'fullscreen': False,
             'show_world_axis': False,
             'show_mesh_axes': False,
-            'caption': None
+            'caption': None,
+            'record_format': 'gif',
+            'gif_palettesize': 64,
+            'gif_subrectangles': False,
+            'gif_quantizer': 'wu',
+            'vsync': True,
         }
+        # The default rotate_axis is an immutable tuple, so a plain
+        # dict copy shares no mutable state between instances
         self._render_flags = self._default_render_flags.copy()
         self._viewer_flags = self._default_viewer_flags.copy()
-        self._viewer_flags['rotate_axis'] = (
-            self._default_viewer_flags['rotate_axis'].copy()
-        )
 
         if render_flags is not None:
             self._render_flags.update(render_flags)
         if viewer_flags is not None:
             self._viewer_flags.update(viewer_flags)
 
-        for key in kwargs:
-            if key in self.render_flags:
-                self._render_flags[key] = kwargs[key]
-            elif key in self.viewer_flags:
-                self._viewer_flags[key] = kwargs[key]
+        if Viewer._RENDER_FLAG_KEYS is None:
+            Viewer._RENDER_FLAG_KEYS = frozenset(self._default_render_flags)
+            Viewer._VIEWER_FLAG_KEYS = frozenset(self._default_viewer_flags)
+        for key, value in kwargs.items():
+            if key in Viewer._RENDER_FLAG_KEYS:
+                self._render_flags[key] = value
+            elif key in Viewer._VIEWER_FLAG_KEYS:
+                self._viewer_flags[key] = value
 
         # TODO MAC OS BUG FOR SHADOWS
         if sys.platform == 'darwin':
             self._render_flags['shadows'] = False
 
+        # The RenderFlags bitmask is derived from render_flags once per
+        # change rather than rebuilt every frame; writes to the dict
+        # invalidate it
+        self._cached_render_flags = None
+        self._render_flags = _FlagDict(
+            self._render_flags, self._invalidate_render_flags
+        )
+
+        # Whether the viewer's extra lighting nodes are currently in the
+        # scene, tracked here so _render doesn't scan the scene per frame
+        self._raymond_attached = False
+        self._direct_attached = False
+
+        # Start the key-cycled states wherever the initial flags landed
+        self._wireframe_state = 3
+        if self._render_flags['flip_wireframe']:
+            self._wireframe_state = 0
+        elif self._render_flags['all_wireframe']:
+            self._wireframe_state = 1
+        elif self._render_flags['all_solid']:
+            self._wireframe_state = 2
+        self._lighting_state = 2
+        if self._viewer_flags['use_raymond_lighting']:
+            self._lighting_state = 0
+        elif self._viewer_flags['use_direct_lighting']:
+            self._lighting_state = 1
+
+        # Flags touched on every tick are mirrored onto plain attributes
+        # so the per-frame path does attribute loads, not dict lookups;
+        # writes to the dict re-sync the mirror
+        self._viewer_flags = _FlagDict(
+            self._viewer_flags, self._sync_viewer_flags
+        )
+        self._sync_viewer_flags()
+
         self._registered_keys = {}
         if registered_keys is not None:
-            self._registered_keys = {
-                ord(k.lower()): registered_keys[k] for k in registered_keys
-            }
+            self._registered_keys = self._normalize_registered_keys(
+                registered_keys
+            )
 
         #######################################################################
         # Save internal settings
         #######################################################################
 
+        # Set when an event invalidates the current frame and cleared by
+        # the scheduled redraw that services it
+        self._needs_redraw = False
+
+        # Cached copy of the last full scene render, blitted back while
+        # only the message overlay is fading so the fade doesn't re-run
+        # the whole scene. Invalid whenever the scene may have changed.
+        self._scene_dirty = True
+        self._scene_cache_tex = None
+        self._scene_cache_fb = None
+        self._scene_cache_dims = (None, None)
+
         # Set up caption stuff
         self._message_text = None
+        # Reused each frame the message is visible; only the alpha
+        # channel changes during the fade
+        self._message_color = np.array([0.1, 0.7, 0.2, 1.0],
+                                       dtype=np.float32)
         self._ticks_till_fade = 2.0 / 3.0 * self.viewer_flags['refresh_rate']
         self._message_opac = 1.0 + self._ticks_till_fade
+        # Caption anchor positions keyed by location, cleared on resize
+        self._caption_cache = {}
 
         # Set up raymond lights and direct lights
         self._raymond_lights = self._create_raymond_lights()
@@ -279,14 +511,25 @@ class Viewer(pyglet.window.Window):
         self._default_persp_cam = None
         self._default_orth_cam = None
         self._trackball = None
-        self._saved_frames = []
+
+        # Recorded frames are streamed to a temp file as they arrive, so
+        # long recordings don't hold every frame in memory
+        self._gif_writer = None
+        self._gif_filename = None
+
+        # Single-worker executor that keeps encoding and image writes
+        # off the render thread; created on first use
+        self._io_executor = None
+
+        # Memoized initial camera pose, keyed on scene scale/centroid
+        self._ipose_cache = None
 
         # Extract main camera from scene and set up our mirrored copy
         znear = None
         zfar = None
         if scene.main_camera_node is not None:
             n = scene.main_camera_node
-            camera = copy.copy(n.camera)
+            camera = _clone_camera(n.camera)
             if isinstance(camera, (PerspectiveCamera, IntrinsicsCamera)):
                 self._default_persp_cam = camera
                 znear = camera.znear
@@ -369,7 +612,7 @@ class Viewer(pyglet.window.Window):
 
     @property
     def render_lock(self):
-        """:class:`threading.RLock` : If acquired, prevents the viewer from
+        """:class:`._RenderLock` : If acquired, prevents the viewer from
         rendering until released.
 
         Run :meth:`.Viewer.render_lock.acquire` before making updates to
@@ -418,7 +661,8 @@ class Viewer(pyglet.window.Window):
 
     @render_flags.setter
     def render_flags(self, value):
-        self._render_flags = value
+        self._render_flags = _FlagDict(value, self._invalidate_render_flags)
+        self._invalidate_render_flags()
 
     @property
     def viewer_flags(self):
@@ -459,13 +703,28 @@ class Viewer(pyglet.window.Window):
           Defaults to `False`.
         - ``caption``: `list of dict`, Text caption(s) to display on
           the viewer. Defaults to `None`.
+        - ``record_format``: `str`, The container used when recording --
+          one of ``'gif'``, ``'mp4'``, or ``'webm'``. The video formats
+          need the ``imageio-ffmpeg`` package. Defaults to ``'gif'``.
+        - ``gif_palettesize``: `int`, The GIF palette size used when
+          recording. Defaults to `64`.
+        - ``gif_subrectangles``: `bool`, Whether the GIF encoder should
+          diff consecutive frames and emit partial updates.
+          Defaults to `False`.
+        - ``gif_quantizer``: `str`, The palette quantizer to use when
+          recording, either ``'wu'`` (fast) or ``'nq'`` (slower, higher
+          quality). Defaults to ``'wu'``.
+        - ``vsync``: `bool`, Whether buffer swaps wait for the display's
+          vertical retrace. Forced off while recording.
+          Defaults to `True`.
 
         """
         return self._viewer_flags
 
     @viewer_flags.setter
     def viewer_flags(self, value):
-        self._viewer_flags = value
+        self._viewer_flags = _FlagDict(value, self._sync_viewer_flags)
+        self._sync_viewer_flags()
 
     @property
     def registered_keys(self):
@@ -485,7 +744,27 @@ class Viewer(pyglet.window.Window):
 
     @registered_keys.setter
     def registered_keys(self, value):
-        self._registered_keys = value
+        self._registered_keys = self._normalize_registered_keys(value)
+
+    @staticmethod
+    def _normalize_registered_keys(value):
+        """Canonicalize registered keys into
+        ``{symbol: (callback, args, kwargs)}`` so dispatch can unpack
+        without re-inspecting the registration format on every press.
+        """
+        normalized = {}
+        for key, tup in value.items():
+            if isinstance(key, str):
+                key = ord(key.lower())
+            if callable(tup):
+                normalized[key] = (tup, (), {})
+            elif len(tup) == 1:
+                normalized[key] = (tup[0], (), {})
+            elif len(tup) == 2:
+                normalized[key] = (tup[0], tuple(tup[1]), {})
+            else:
+                normalized[key] = (tup[0], tuple(tup[1]), tup[2])
+        return normalized
 
     def close_external(self):
         """Close the viewer from another thread.
@@ -497,29 +776,56 @@ class Viewer(pyglet.window.Window):
         while self.is_active:
             time.sleep(1.0 / self.viewer_flags['refresh_rate'])
 
-    def save_gif(self, filename=None):
-        """Save the stored GIF frames to a file.
+    def save_recording(self, filename=None):
+        """Save the recorded frames to a file.
+
+        The container is selected with ``viewer_flags['record_format']``
+        before recording starts -- GIF by default, or MP4/WebM when the
+        ``imageio-ffmpeg`` package is available.
 
         To use this asynchronously, run the viewer with the ``record``
         flag and the ``run_in_thread`` flags set.
         Kill the viewer after your desired time with
-        :meth:`.Viewer.close_external`, and then call :meth:`.Viewer.save_gif`.
+        :meth:`.Viewer.close_external`, and then call
+        :meth:`.Viewer.save_recording`.
 
         Parameters
         ----------
         filename : str
-            The file to save the GIF to. If not specified,
+            The file to save the recording to. If not specified,
             a file dialog will be opened to ask the user where
-            to save the GIF file.
+            to save the file.
         """
         if filename is None:
-            filename = self._get_save_filename(['gif', 'all'])
-        if filename is not None:
-            self.viewer_flags['save_directory'] = os.path.dirname(filename)
-            imageio.mimwrite(filename, self._saved_frames,
-                             fps=self.viewer_flags['refresh_rate'],
-                             palettesize=128, subrectangles=True)
-        self._saved_frames = []
+            fmt = self.viewer_flags['record_format']
+            filename = self._get_save_filename([fmt, 'all'])
+        if self._gif_writer is not None:
+            # Frames were encoded on the fly, so once the pending
+            # appends drain, closing the writer is all that remains
+            writer = self._gif_writer
+            self._gif_writer = None
+            self._get_io_executor().submit(writer.close).result()
+            if filename is not None:
+                self.viewer_flags['save_directory'] = os.path.dirname(filename)
+                shutil.move(self._gif_filename, filename)
+            else:
+                os.remove(self._gif_filename)
+            self._gif_filename = None
+
+    def save_gif(self, filename=None):
+        """Save the recorded frames to a file.
+
+        Kept for backward compatibility; see
+        :meth:`.Viewer.save_recording`.
+
+        Parameters
+        ----------
+        filename : str
+            The file to save the recording to. If not specified,
+            a file dialog will be opened to ask the user where
+            to save the file.
+        """
+        self.save_recording(filename)
 
     def on_close(self):
         """Exit the event loop when the window is closed.
@@ -542,7 +848,13 @@ class Viewer(pyglet.window.Window):
         # Delete any axis nodes that we've attached
         self._remove_axes()
 
-        # Delete renderer
+        # Flush any pending encodes or image writes
+        if self._io_executor is not None:
+            self._io_executor.shutdown(wait=True)
+            self._io_executor = None
+
+        # Delete the scene cache and renderer
+        self._delete_scene_cache()
         if self._renderer is not None:
             self._renderer.delete()
         self._renderer = None
@@ -564,43 +876,66 @@ class Viewer(pyglet.window.Window):
         if self._renderer is None:
             return
 
+        locked = False
         if self.run_in_thread or not self._auto_start:
-            self.render_lock.acquire()
+            locked = self.render_lock.begin_draw()
 
         # Make OpenGL context current
         self.switch_to()
 
-        # Render the scene
-        self.clear()
-        self._render()
-
+        # While only the status message is fading, blit the cached
+        # scene back instead of re-rendering it. The cache is never
+        # used when another thread may be updating the scene.
+        external_updates = self.run_in_thread or not self._auto_start
+        if (not self._scene_dirty and not external_updates and
+                self._scene_cache_tex is not None):
+            self._blit_scene_cache()
+        else:
+            # Render the scene
+            self.clear()
+            self._render()
+            if not external_updates:
+                self._copy_scene_to_cache()
+            self._scene_dirty = False
+
+        # Collect the fade message and all captions into one batch so
+        # the text pass configures GL state once per frame
+        text_entries = []
         if self._message_text is not None:
-            self._renderer.render_text(
-                self._message_text,
-                self.viewport_size[0] - TEXT_PADDING,
-                TEXT_PADDING,
-                font_pt=20,
-                color=np.array([0.1, 0.7, 0.2,
-                                np.clip(self._message_opac, 0.0, 1.0)]),
-                align=TextAlign.BOTTOM_RIGHT
-            )
-
-        if self.viewer_flags['caption'] is not None:
-            for caption in self.viewer_flags['caption']:
+            opac = self._message_opac
+            if opac < 0.0:
+                opac = 0.0
+            elif opac > 1.0:
+                opac = 1.0
+            self._message_color[3] = opac
+            text_entries.append({
+                'text': self._message_text,
+                'x': self.viewport_size[0] - TEXT_PADDING,
+                'y': TEXT_PADDING,
+                'font_pt': 20,
+                'color': self._message_color,
+                'align': TextAlign.BOTTOM_RIGHT,
+            })
+
+        if self._vf_caption is not None:
+            for caption in self._vf_caption:
                 xpos, ypos = self._location_to_x_y(caption['location'])
-                self._renderer.render_text(
-                    caption['text'],
-                    xpos,
-                    ypos,
-                    font_name=caption['font_name'],
-                    font_pt=caption['font_pt'],
-                    color=caption['color'],
-                    scale=caption['scale'],
-                    align=caption['location']
-                )
+                text_entries.append({
+                    'text': caption['text'],
+                    'x': xpos,
+                    'y': ypos,
+                    'font_name': caption['font_name'],
+                    'font_pt': caption['font_pt'],
+                    'color': caption['color'],
+                    'scale': caption['scale'],
+                    'align': caption['location'],
+                })
+
+        if text_entries:
+            self._renderer.render_texts(text_entries)
 
         if self.run_in_thread or not self._auto_start:
-            self.render_lock.release()
+            self.render_lock.end_draw(locked)
 
     def on_resize(self, width, height):
         """Resize the camera and trackball when the window is resized.
@@ -612,11 +947,16 @@ class Viewer(pyglet.window.Window):
         self._trackball.resize(self._viewport_size)
         self._renderer.viewport_width = self._viewport_size[0]
         self._renderer.viewport_height = self._viewport_size[1]
-        self.on_draw()
+        self._caption_cache.clear()
+        # Coalesce resize bursts: mark the scene dirty and let the next
+        # scheduled tick redraw once, instead of rendering per event
+        self._scene_dirty = True
+        self._needs_redraw = True
 
     def on_mouse_press(self, x, y, buttons, modifiers):
         """Record an initial mouse press.
         """
+        self._scene_dirty = True
         self._trackball.set_state(Trackball.STATE_ROTATE)
         if (buttons == pyglet.window.mouse.LEFT):
             ctrl = (modifiers & pyglet.window.key.MOD_CTRL)
@@ -632,7 +972,9 @@ class Viewer(pyglet.window.Window):
         elif (buttons == pyglet.window.mouse.RIGHT):
             self._trackball.set_state(Trackball.STATE_ZOOM)
 
-        self._trackball.down(np.array([x, y]))
+        # The trackball accepts any 2-sequence, so a tuple avoids
+        # allocating an ndarray per mouse event
+        self._trackball.down((x, y))
 
         # Stop animating while using the mouse
         self.viewer_flags['mouse_pressed'] = True
@@ -640,7 +982,8 @@ class Viewer(pyglet.window.Window):
     def on_mouse_drag(self, x, y, dx, dy, buttons, modifiers):
         """Record a mouse drag.
         """
-        self._trackball.drag(np.array([x, y]))
+        self._scene_dirty = True
+        self._trackball.drag((x, y))
 
     def on_mouse_release(self, x, y, button, modifiers):
         """Record a mouse release.
@@ -650,6 +993,7 @@ class Viewer(pyglet.window.Window):
     def on_mouse_scroll(self, x, y, dx, dy):
         """Record a mouse scroll.
         """
+        self._scene_dirty = True
         if self.viewer_flags['use_perspective_cam']:
             self._trackball.scroll(dy)
         else:
@@ -670,191 +1014,184 @@ class Viewer(pyglet.window.Window):
     def on_key_press(self, symbol, modifiers):
         """Record a key press.
         """
-        # First, check for registered key callbacks
-        if symbol in self.registered_keys:
-            tup = self.registered_keys[symbol]
-            callback = None
-            args = []
-            kwargs = {}
-            if not isinstance(tup, (list, tuple, np.ndarray)):
-                callback = tup
-            else:
-                callback = tup[0]
-                if len(tup) == 2:
-                    args = tup[1]
-                if len(tup) == 3:
-                    kwargs = tup[2]
+        # Key handlers (and registered callbacks) may change anything
+        self._scene_dirty = True
+
+        # First, check for registered key callbacks, which are stored
+        # pre-normalized as (callback, args, kwargs)
+        registered = self._registered_keys.get(symbol)
+        if registered is not None:
+            callback, args, kwargs = registered
             callback(self, *args, **kwargs)
             return
 
-        # Otherwise, use default key functions
-
-        # A causes the frame to rotate
+        # Otherwise, use default key functions, dispatched through the
+        # class-level handler table
         self._message_text = None
-        if symbol == pyglet.window.key.A:
-            self.viewer_flags['rotate'] = not self.viewer_flags['rotate']
-            if self.viewer_flags['rotate']:
-                self._message_text = 'Rotation On'
-            else:
-                self._message_text = 'Rotation Off'
+        handler = Viewer._KEY_HANDLERS.get(symbol)
+        if handler is not None:
+            handler(self)
 
-        # C toggles backface culling
-        elif symbol == pyglet.window.key.C:
-            self.render_flags['cull_faces'] = (
-                not self.render_flags['cull_faces']
-            )
-            if self.render_flags['cull_faces']:
-                self._message_text = 'Cull Faces On'
-            else:
-                self._message_text = 'Cull Faces Off'
+        if self._message_text is not None:
+            self._message_opac = 1.0 + self._ticks_till_fade
 
-        # F toggles face normals
-        elif symbol == pyglet.window.key.F:
-            self.viewer_flags['fullscreen'] = (
-                not self.viewer_flags['fullscreen']
-            )
-            self.set_fullscreen(self.viewer_flags['fullscreen'])
-            self.activate()
-            if self.viewer_flags['fullscreen']:
-                self._message_text = 'Fullscreen On'
-            else:
-                self._message_text = 'Fullscreen Off'
+    def _key_toggle_rotation(self):
+        self.viewer_flags['rotate'] = not self.viewer_flags['rotate']
+        if self.viewer_flags['rotate']:
+            self._message_text = 'Rotation On'
+        else:
+            self._message_text = 'Rotation Off'
 
-        # S toggles shadows
-        elif symbol == pyglet.window.key.H and sys.platform != 'darwin':
-            self.render_flags['shadows'] = not self.render_flags['shadows']
-            if self.render_flags['shadows']:
-                self._message_text = 'Shadows On'
-            else:
-                self._message_text = 'Shadows Off'
-
-        elif symbol == pyglet.window.key.I:
-            if (self.viewer_flags['show_world_axis'] and not
-                    self.viewer_flags['show_mesh_axes']):
-                self.viewer_flags['show_world_axis'] = False
-                self.viewer_flags['show_mesh_axes'] = True
-                self._set_axes(False, True)
-                self._message_text = 'Mesh Axes On'
-            elif (not self.viewer_flags['show_world_axis'] and
-                    self.viewer_flags['show_mesh_axes']):
-                self.viewer_flags['show_world_axis'] = True
-                self.viewer_flags['show_mesh_axes'] = True
-                self._set_axes(True, True)
-                self._message_text = 'All Axes On'
-            elif (self.viewer_flags['show_world_axis'] and
-                    self.viewer_flags['show_mesh_axes']):
-                self.viewer_flags['show_world_axis'] = False
-                self.viewer_flags['show_mesh_axes'] = False
-                self._set_axes(False, False)
-                self._message_text = 'All Axes Off'
-            else:
-                self.viewer_flags['show_world_axis'] = True
-                self.viewer_flags['show_mesh_axes'] = False
-                self._set_axes(True, False)
-                self._message_text = 'World Axis On'
-
-        # L toggles the lighting mode
-        elif symbol == pyglet.window.key.L:
-            if self.viewer_flags['use_raymond_lighting']:
-                self.viewer_flags['use_raymond_lighting'] = False
-                self.viewer_flags['use_direct_lighting'] = True
-                self._message_text = 'Direct Lighting'
-            elif self.viewer_flags['use_direct_lighting']:
-                self.viewer_flags['use_raymond_lighting'] = False
-                self.viewer_flags['use_direct_lighting'] = False
-                self._message_text = 'Default Lighting'
-            else:
-                self.viewer_flags['use_raymond_lighting'] = True
-                self.viewer_flags['use_direct_lighting'] = False
-                self._message_text = 'Raymond Lighting'
-
-        # M toggles face normals
-        elif symbol == pyglet.window.key.M:
-            self.render_flags['face_normals'] = (
-                not self.render_flags['face_normals']
-            )
-            if self.render_flags['face_normals']:
-                self._message_text = 'Face Normals On'
-            else:
-                self._message_text = 'Face Normals Off'
+    def _key_toggle_culling(self):
+        self.render_flags['cull_faces'] = (
+            not self.render_flags['cull_faces']
+        )
+        if self.render_flags['cull_faces']:
+            self._message_text = 'Cull Faces On'
+        else:
+            self._message_text = 'Cull Faces Off'
 
-        # N toggles vertex normals
-        elif symbol == pyglet.window.key.N:
-            self.render_flags['vertex_normals'] = (
-                not self.render_flags['vertex_normals']
-            )
-            if self.render_flags['vertex_normals']:
-                self._message_text = 'Vert Normals On'
-            else:
-                self._message_text = 'Vert Normals Off'
+    def _key_toggle_fullscreen(self):
+        self.viewer_flags['fullscreen'] = (
+            not self.viewer_flags['fullscreen']
+        )
+        self.set_fullscreen(self.viewer_flags['fullscreen'])
+        self.activate()
+        if self.viewer_flags['fullscreen']:
+            self._message_text = 'Fullscreen On'
+        else:
+            self._message_text = 'Fullscreen Off'
 
-        # O toggles orthographic camera mode
-        elif symbol == pyglet.window.key.O:
-            self.viewer_flags['use_perspective_cam'] = (
-                not self.viewer_flags['use_perspective_cam']
-            )
-            if self.viewer_flags['use_perspective_cam']:
-                camera = self._default_persp_cam
-                self._message_text = 'Perspective View'
-            else:
-                camera = self._default_orth_cam
-                self._message_text = 'Orthographic View'
+    def _key_toggle_shadows(self):
+        # TODO MAC OS BUG FOR SHADOWS
+        if sys.platform == 'darwin':
+            return
+        self.render_flags['shadows'] = not self.render_flags['shadows']
+        if self.render_flags['shadows']:
+            self._message_text = 'Shadows On'
+        else:
+            self._message_text = 'Shadows Off'
+
+    def _key_cycle_axes(self):
+        if (self.viewer_flags['show_world_axis'] and not
+                self.viewer_flags['show_mesh_axes']):
+            self.viewer_flags['show_world_axis'] = False
+            self.viewer_flags['show_mesh_axes'] = True
+            self._set_axes(False, True)
+            self._message_text = 'Mesh Axes On'
+        elif (not self.viewer_flags['show_world_axis'] and
+                self.viewer_flags['show_mesh_axes']):
+            self.viewer_flags['show_world_axis'] = True
+            self.viewer_flags['show_mesh_axes'] = True
+            self._set_axes(True, True)
+            self._message_text = 'All Axes On'
+        elif (self.viewer_flags['show_world_axis'] and
+                self.viewer_flags['show_mesh_axes']):
+            self.viewer_flags['show_world_axis'] = False
+            self.viewer_flags['show_mesh_axes'] = False
+            self._set_axes(False, False)
+            self._message_text = 'All Axes Off'
+        else:
+            self.viewer_flags['show_world_axis'] = True
+            self.viewer_flags['show_mesh_axes'] = False
+            self._set_axes(True, False)
+            self._message_text = 'World Axis On'
+
+    def _key_cycle_lighting(self):
+        self._lighting_state = (self._lighting_state + 1) % 3
+        name, raymond, direct = Viewer._LIGHTING_STATES[
+            self._lighting_state
+        ]
+        self.viewer_flags['use_raymond_lighting'] = raymond
+        self.viewer_flags['use_direct_lighting'] = direct
+        self._message_text = name
+
+    def _key_toggle_face_normals(self):
+        self.render_flags['face_normals'] = (
+            not self.render_flags['face_normals']
+        )
+        if self.render_flags['face_normals']:
+            self._message_text = 'Face Normals On'
+        else:
+            self._message_text = 'Face Normals Off'
 
-            cam_pose = self._camera_node.matrix.copy()
-            cam_node = Node(matrix=cam_pose, camera=camera)
-            self.scene.remove_node(self._camera_node)
-            self.scene.add_node(cam_node)
-            self.scene.main_camera_node = cam_node
-            self._camera_node = cam_node
+    def _key_toggle_vertex_normals(self):
+        self.render_flags['vertex_normals'] = (
+            not self.render_flags['vertex_normals']
+        )
+        if self.render_flags['vertex_normals']:
+            self._message_text = 'Vert Normals On'
+        else:
+            self._message_text = 'Vert Normals Off'
 
-        # Q quits the viewer
-        elif symbol == pyglet.window.key.Q:
-            self.on_close()
+    def _key_toggle_camera_mode(self):
+        self.viewer_flags['use_perspective_cam'] = (
+            not self.viewer_flags['use_perspective_cam']
+        )
+        if self.viewer_flags['use_perspective_cam']:
+            camera = self._default_persp_cam
+            self._message_text = 'Perspective View'
+        else:
+            camera = self._default_orth_cam
+            self._message_text = 'Orthographic View'
+
+        # Swapping the camera on the existing node keeps its pose and
+        # child light nodes intact, with no scene-graph edits
+        self.scene.replace_node_object(self._camera_node, camera)
 
-        # R starts recording frames
-        elif symbol == pyglet.window.key.R:
+    def _key_quit(self):
+        self.on_close()
+
+    def _key_toggle_record(self):
+        if self.viewer_flags['record']:
+            self.save_recording()
+            self.set_caption(self.viewer_flags['window_title'])
+        else:
+            self.set_caption(
+                '{} (RECORDING)'.format(self.viewer_flags['window_title'])
+            )
+        self.viewer_flags['record'] = not self.viewer_flags['record']
+        # While recording, don't let the monitor refresh throttle capture
+        try:
             if self.viewer_flags['record']:
-                self.save_gif()
-                self.set_caption(self.viewer_flags['window_title'])
+                self.set_vsync(False)
             else:
-                self.set_caption(
-                    '{} (RECORDING)'.format(self.viewer_flags['window_title'])
-                )
-            self.viewer_flags['record'] = not self.viewer_flags['record']
+                self.set_vsync(bool(self.viewer_flags['vsync']))
+        except Exception:
+            pass
 
-        # S saves the current frame as an image
-        elif symbol == pyglet.window.key.S:
-            self._save_image()
+    def _key_save_image(self):
+        self._save_image()
 
-        # W toggles through wireframe modes
-        elif symbol == pyglet.window.key.W:
-            if self.render_flags['flip_wireframe']:
-                self.render_flags['flip_wireframe'] = False
-                self.render_flags['all_wireframe'] = True
-                self.render_flags['all_solid'] = False
-                self._message_text = 'All Wireframe'
-            elif self.render_flags['all_wireframe']:
-                self.render_flags['flip_wireframe'] = False
-                self.render_flags['all_wireframe'] = False
-                self.render_flags['all_solid'] = True
-                self._message_text = 'All Solid'
-            elif self.render_flags['all_solid']:
-                self.render_flags['flip_wireframe'] = False
-                self.render_flags['all_wireframe'] = False
-                self.render_flags['all_solid'] = False
-                self._message_text = 'Default Wireframe'
-            else:
-                self.render_flags['flip_wireframe'] = True
-                self.render_flags['all_wireframe'] = False
-                self.render_flags['all_solid'] = False
-                self._message_text = 'Flip Wireframe'
+    def _key_cycle_wireframe(self):
+        self._wireframe_state = (self._wireframe_state + 1) % 4
+        name, flip, all_wf, all_solid = Viewer._WIREFRAME_STATES[
+            self._wireframe_state
+        ]
+        self.render_flags['flip_wireframe'] = flip
+        self.render_flags['all_wireframe'] = all_wf
+        self.render_flags['all_solid'] = all_solid
+        self._message_text = name
 
-        # Z resets the camera viewpoint
-        elif symbol == pyglet.window.key.Z:
-            self._reset_view()
+    def _key_reset_view(self):
+        self._reset_view()
 
-        if self._message_text is not None:
-            self._message_opac = 1.0 + self._ticks_till_fade
+    _KEY_HANDLERS = {
+        pyglet.window.key.A: _key_toggle_rotation,
+        pyglet.window.key.C: _key_toggle_culling,
+        pyglet.window.key.F: _key_toggle_fullscreen,
+        pyglet.window.key.H: _key_toggle_shadows,
+        pyglet.window.key.I: _key_cycle_axes,
+        pyglet.window.key.L: _key_cycle_lighting,
+        pyglet.window.key.M: _key_toggle_face_normals,
+        pyglet.window.key.N: _key_toggle_vertex_normals,
+        pyglet.window.key.O: _key_toggle_camera_mode,
+        pyglet.window.key.Q: _key_quit,
+        pyglet.window.key.R: _key_toggle_record,
+        pyglet.window.key.S: _key_save_image,
+        pyglet.window.key.W: _key_cycle_wireframe,
+        pyglet.window.key.Z: _key_reset_view,
+    }
 
     @staticmethod
     def _time_event(dt, self):
@@ -864,10 +1201,9 @@ class Viewer(pyglet.window.Window):
         if not self._is_active:
             return
 
-        if self.viewer_flags['record']:
+        if self._vf_record:
             self._record()
-        if (self.viewer_flags['rotate'] and not
-                self.viewer_flags['mouse_pressed']):
+        if self._vf_rotate and not self._vf_mouse_pressed:
             self._rotate()
 
         # Manage message opacity
@@ -879,11 +1215,23 @@ class Viewer(pyglet.window.Window):
             if self._message_opac < 0.05:
                 self._message_opac = 1.0 + self._ticks_till_fade
                 self._message_text = None
+                # One more draw to clear the faded message from the
+                # last rendered frame
+                self._needs_redraw = True
 
         if self._should_close:
             self.on_close()
         else:
-            self.on_draw()
+            # Skip the redraw entirely when nothing can have changed:
+            # no scene edits, no pending resize, no fading message, and
+            # no recording. Another thread may mutate the scene when
+            # run_in_thread is set, so always draw in that case.
+            external_updates = self.run_in_thread or not self._auto_start
+            if (external_updates or self._scene_dirty or
+                    self._needs_redraw or self._vf_record or
+                    self._message_text is not None):
+                self._needs_redraw = False
+                self.on_draw()
 
     def _reset_view(self):
         """Reset the view to a good initial state.
@@ -903,16 +1251,26 @@ class Viewer(pyglet.window.Window):
         self._trackball = Trackball(
             self._default_camera_pose, self.viewport_size, scale, centroid
         )
+        self._last_pose_version = -1
 
     def _get_save_filename(self, file_exts):
         file_types = {
             'png': ('png files', '*.png'),
             'jpg': ('jpeg files', '*.jpg'),
             'gif': ('gif files', '*.gif'),
+            'mp4': ('mp4 files', '*.mp4'),
+            'webm': ('webm files', '*.webm'),
             'all': ('all files', '*'),
         }
         filetypes = [file_types[x] for x in file_exts]
         try:
+            if Viewer._tk_modules is None:
+                try:
+                    from Tkinter import Tk, tkFileDialog as filedialog
+                except ImportError:
+                    from tkinter import Tk, filedialog as filedialog
+                Viewer._tk_modules = (Tk, filedialog)
+            Tk, filedialog = Viewer._tk_modules
             root = Tk()
             save_dir = self.viewer_flags['save_directory']
             if save_dir is None:
@@ -933,14 +1291,102 @@ class Viewer(pyglet.window.Window):
         filename = self._get_save_filename(['png', 'jpg', 'gif', 'all'])
         if filename is not None:
             self.viewer_flags['save_directory'] = os.path.dirname(filename)
-            imageio.imwrite(filename, self._renderer.read_color_buf())
+            data = self._renderer.read_color_buf()
+            self._get_io_executor().submit(imageio.imwrite, filename, data)
+
+    def _get_io_executor(self):
+        if self._io_executor is None:
+            self._io_executor = ThreadPoolExecutor(max_workers=1)
+        return self._io_executor
+
+    def _copy_scene_to_cache(self):
+        """Copy the freshly-rendered back buffer into the cache texture.
+        """
+        width = self._renderer.viewport_width
+        height = self._renderer.viewport_height
+        resized = self._scene_cache_dims != (width, height)
+        if self._scene_cache_tex is None or resized:
+            self._delete_scene_cache()
+            self._scene_cache_tex = glGenTextures(1)
+            self._scene_cache_fb = glGenFramebuffers(1)
+        glBindTexture(GL_TEXTURE_2D, self._scene_cache_tex)
+        glBindFramebuffer(GL_READ_FRAMEBUFFER, 0)
+        glReadBuffer(GL_BACK)
+        glCopyTexImage2D(GL_TEXTURE_2D, 0, GL_RGB8, 0, 0, width, height, 0)
+        glBindTexture(GL_TEXTURE_2D, 0)
+        if resized or self._scene_cache_dims == (None, None):
+            glBindFramebuffer(GL_FRAMEBUFFER, self._scene_cache_fb)
+            glFramebufferTexture2D(
+                GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_TEXTURE_2D,
+                self._scene_cache_tex, 0
+            )
+            glBindFramebuffer(GL_FRAMEBUFFER, 0)
+            self._scene_cache_dims = (width, height)
+
+    def _blit_scene_cache(self):
+        """Redraw the window from the cache texture with a single blit.
+        """
+        width, height = self._scene_cache_dims
+        glBindFramebuffer(GL_READ_FRAMEBUFFER, self._scene_cache_fb)
+        glBindFramebuffer(GL_DRAW_FRAMEBUFFER, 0)
+        glBlitFramebuffer(0, 0, width, height, 0, 0, width, height,
+                          GL_COLOR_BUFFER_BIT, GL_NEAREST)
+        glBindFramebuffer(GL_READ_FRAMEBUFFER, 0)
+
+    def _delete_scene_cache(self):
+        if self._scene_cache_tex is not None:
+            glDeleteTextures([self._scene_cache_tex])
+            glDeleteFramebuffers(1, [self._scene_cache_fb])
+            self._scene_cache_tex = None
+            self._scene_cache_fb = None
+            self._scene_cache_dims = (None, None)
 
     def _record(self):
         """Save another frame for the GIF.
+
+        Frames are appended to a streaming writer rather than buffered,
+        so peak memory stays constant no matter how long the recording.
+        The readback itself is double-buffered through pixel-pack
+        buffers, so each frame's GPU transfer overlaps with rendering
+        the next one rather than stalling the pipeline.
         """
-        data = self._renderer.read_color_buf()
-        if not np.all(data == 0.0):
-            self._saved_frames.append(data)
+        data = self._renderer.read_color_buf_async()
+        if data is None:
+            return
+        # Blank frames come back all-zero. Probe a small head slice
+        # first so the common non-blank frame touches a few KB instead
+        # of scanning the whole buffer, and use any() for the rest so
+        # no `== 0` boolean temporary is built either way.
+        flat = data.reshape(-1)
+        if not flat[:4096].any() and not flat[4096:].any():
+            return
+        if self._gif_writer is None:
+            fmt = self.viewer_flags['record_format']
+            save_dir = self.viewer_flags['save_directory']
+            if save_dir is None:
+                save_dir = tempfile.gettempdir()
+            fd, self._gif_filename = tempfile.mkstemp(
+                suffix='.{}'.format(fmt), dir=save_dir
+            )
+            os.close(fd)
+            if fmt == 'gif':
+                self._gif_writer = imageio.get_writer(
+                    self._gif_filename, mode='I',
+                    fps=self.viewer_flags['refresh_rate'],
+                    palettesize=self.viewer_flags['gif_palettesize'],
+                    subrectangles=self.viewer_flags['gif_subrectangles'],
+                    quantizer=self.viewer_flags['gif_quantizer']
+                )
+            else:
+                codec = 'libx264' if fmt == 'mp4' else 'libvpx-vp9'
+                self._gif_writer = imageio.get_writer(
+                    self._gif_filename,
+                    fps=self.viewer_flags['refresh_rate'],
+                    codec=codec, quality=8, macro_block_size=1
+                )
+        # Hand the frame to the encoding worker; the single-worker
+        # queue preserves frame order
+        self._get_io_executor().submit(self._gif_writer.append_data, data)
 
     def _rotate(self):
         """Animate the scene by rotating the camera.
@@ -948,53 +1394,83 @@ class Viewer(pyglet.window.Window):
         az = (self.viewer_flags['rotate_rate'] /
               self.viewer_flags['refresh_rate'])
         self._trackball.rotate(az, self.viewer_flags['rotate_axis'])
+        self._scene_dirty = True
 
     def _render(self):
         """Render the scene into the framebuffer and flip.
         """
         scene = self.scene
-        self._camera_node.matrix = self._trackball.pose.copy()
+        # Only push the trackball pose to the camera when it has
+        # actually changed; copying a 4x4 every frame adds up at 30 Hz
+        version = self._trackball._pose_version
+        if version != self._last_pose_version:
+            self._camera_node.matrix = self._trackball.pose.copy()
+            self._last_pose_version = version
 
         # Set lighting
-        vli = self.viewer_flags['lighting_intensity']
-        if self.viewer_flags['use_raymond_lighting']:
+        vli = self._vf_lighting_intensity
+        if self._vf_use_raymond_lighting:
             for n in self._raymond_lights:
                 n.light.intensity = vli / 3.0
-                if not self.scene.has_node(n):
-                    scene.add_node(n, parent_node=self._camera_node)
+            if not self._raymond_attached:
+                scene.add_nodes_bulk([
+                    (n, self._camera_node) for n in self._raymond_lights
+                ])
+                self._raymond_attached = True
         else:
             self._direct_light.light.intensity = vli
-            for n in self._raymond_lights:
-                if self.scene.has_node(n):
-                    self.scene.remove_node(n)
+            if self._raymond_attached:
+                scene.remove_nodes_bulk(self._raymond_lights)
+                self._raymond_attached = False
 
-        if self.viewer_flags['use_direct_lighting']:
-            if not self.scene.has_node(self._direct_light):
+        if self._vf_use_direct_lighting:
+            if not self._direct_attached:
                 scene.add_node(
                     self._direct_light, parent_node=self._camera_node
                 )
-        elif self.scene.has_node(self._direct_light):
-            self.scene.remove_node(self._direct_light)
-
-        flags = RenderFlags.NONE
-        if self.render_flags['flip_wireframe']:
-            flags |= RenderFlags.FLIP_WIREFRAME
-        elif self.render_flags['all_wireframe']:
-            flags |= RenderFlags.ALL_WIREFRAME
-        elif self.render_flags['all_solid']:
-            flags |= RenderFlags.ALL_SOLID
+                self._direct_attached = True
+        elif self._direct_attached:
+            scene.remove_node(self._direct_light)
+            self._direct_attached = False
+
+        flags = self._cached_render_flags
+        if flags is None:
+            flags = RenderFlags.NONE
+            if self.render_flags['flip_wireframe']:
+                flags |= RenderFlags.FLIP_WIREFRAME
+            elif self.render_flags['all_wireframe']:
+                flags |= RenderFlags.ALL_WIREFRAME
+            elif self.render_flags['all_solid']:
+                flags |= RenderFlags.ALL_SOLID
 
-        if self.render_flags['shadows']:
-            flags |= RenderFlags.SHADOWS_DIRECTIONAL | RenderFlags.SHADOWS_SPOT
-        if self.render_flags['vertex_normals']:
-            flags |= RenderFlags.VERTEX_NORMALS
-        if self.render_flags['face_normals']:
-            flags |= RenderFlags.FACE_NORMALS
-        if not self.render_flags['cull_faces']:
-            flags |= RenderFlags.SKIP_CULL_FACES
+            if self.render_flags['shadows']:
+                flags |= (RenderFlags.SHADOWS_DIRECTIONAL |
+                          RenderFlags.SHADOWS_SPOT)
+            if self.render_flags['vertex_normals']:
+                flags |= RenderFlags.VERTEX_NORMALS
+            if self.render_flags['face_normals']:
+                flags |= RenderFlags.FACE_NORMALS
+            if not self.render_flags['cull_faces']:
+                flags |= RenderFlags.SKIP_CULL_FACES
+            self._cached_render_flags = flags
 
         self._renderer.render(self.scene, flags)
 
+    def _invalidate_render_flags(self):
+        self._cached_render_flags = None
+        self._scene_dirty = True
+
+    def _sync_viewer_flags(self):
+        self._scene_dirty = True
+        flags = self._viewer_flags
+        self._vf_record = flags['record']
+        self._vf_rotate = flags['rotate']
+        self._vf_mouse_pressed = flags['mouse_pressed']
+        self._vf_use_raymond_lighting = flags['use_raymond_lighting']
+        self._vf_use_direct_lighting = flags['use_direct_lighting']
+        self._vf_lighting_intensity = flags['lighting_intensity']
+        self._vf_caption = flags['caption']
+
     def _init_and_start_app(self):
         # Try multiple configs starting with target OpenGL version
         # and multisampling and removing these options if exception
@@ -1029,7 +1505,13 @@ class Viewer(pyglet.window.Window):
 
         if not self.context:
             raise ValueError('Unable to initialize an OpenGL 3+ context')
-        clock.schedule_interval(
+        try:
+            self.set_vsync(bool(self.viewer_flags['vsync']))
+        except Exception:
+            pass  # Not all platforms allow changing the swap interval
+        # The soft variant staggers the tick phase and won't queue up
+        # missed callbacks when a heavy scene can't hold the rate
+        clock.schedule_interval_soft(
             Viewer._time_event, 1.0 / self.viewer_flags['refresh_rate'], self
         )
         self.switch_to()
@@ -1044,7 +1526,15 @@ class Viewer(pyglet.window.Window):
         if scale == 0.0:
             scale = DEFAULT_SCENE_SCALE
 
-        s2 = 1.0 / np.sqrt(2.0)
+        # Scene centroid and scale rarely change between Z-presses, so
+        # the pose is memoized; callers get a copy since the returned
+        # pose is theirs to mutate
+        key = (float(scale), np.asanyarray(centroid).tobytes())
+        if self._ipose_cache is not None and self._ipose_cache[0] == key:
+            return self._ipose_cache[1].copy()
+
+        # Plain math calls keep this free of scalar ufunc dispatch
+        s2 = 1.0 / math.sqrt(2.0)
         cp = np.eye(4)
         cp[:3,:3] = np.array([
             [0.0, -s2, s2],
@@ -1052,42 +1542,47 @@ class Viewer(pyglet.window.Window):
             [0.0, s2, s2]
         ])
         hfov = np.pi / 6.0
-        dist = scale / (2.0 * np.tan(hfov))
-        cp[:3,3] = dist * np.array([1.0, 0.0, 1.0]) + centroid
+        dist = scale / (2.0 * math.tan(hfov))
+        cp[0,3] = dist + centroid[0]
+        cp[1,3] = centroid[1]
+        cp[2,3] = dist + centroid[2]
 
-        return cp
+        self._ipose_cache = (key, cp)
+        return cp.copy()
 
     def _create_raymond_lights(self):
         thetas = np.pi * np.array([1.0 / 6.0, 1.0 / 6.0, 1.0 / 6.0])
         phis = np.pi * np.array([0.0, 2.0 / 3.0, 4.0 / 3.0])
 
-        nodes = []
-
-        for phi, theta in zip(phis, thetas):
-            xp = np.sin(theta) * np.cos(phi)
-            yp = np.sin(theta) * np.sin(phi)
-            zp = np.cos(theta)
-
-            z = np.array([xp, yp, zp])
-            z = z / np.linalg.norm(z)
-            x = np.array([-z[1], z[0], 0.0])
-            if np.linalg.norm(x) == 0:
-                x = np.array([1.0, 0.0, 0.0])
-            x = x / np.linalg.norm(x)
-            y = np.cross(z, x)
-
-            matrix = np.eye(4)
-            matrix[:3,:3] = np.c_[x,y,z]
-            nodes.append(Node(
-                light=DirectionalLight(color=np.ones(3), intensity=1.0),
+        # Build all three frames in one vectorized batch
+        z = np.stack([
+            np.sin(thetas) * np.cos(phis),
+            np.sin(thetas) * np.sin(phis),
+            np.cos(thetas)
+        ], axis=1)
+        z /= np.linalg.norm(z, axis=1, keepdims=True)
+        x = np.stack([-z[:,1], z[:,0], np.zeros(len(z))], axis=1)
+        norms = np.linalg.norm(x, axis=1, keepdims=True)
+        x = np.where(norms == 0, [1.0, 0.0, 0.0], x)
+        x /= np.linalg.norm(x, axis=1, keepdims=True)
+        y = np.cross(z, x)
+
+        matrices = np.tile(np.eye(4), (len(z), 1, 1))
+        matrices[:,:3,0] = x
+        matrices[:,:3,1] = y
+        matrices[:,:3,2] = z
+
+        return [
+            Node(
+                light=DirectionalLight(color=_ONES3, intensity=1.0),
                 matrix=matrix
-            ))
-
-        return nodes
+            )
+            for matrix in matrices
+        ]
 
     def _create_direct_light(self):
-        light = DirectionalLight(color=np.ones(3), intensity=1.0)
-        n = Node(light=light, matrix=np.eye(4))
+        light = DirectionalLight(color=_ONES3, intensity=1.0)
+        n = Node(light=light, matrix=_EYE4)
         return n
 
     def _set_axes(self, world, mesh):
@@ -1102,30 +1597,28 @@ class Viewer(pyglet.window.Window):
                 self.scene.remove_node(self._axes['scene'])
                 self._axes.pop('scene')
 
+        mesh_nodes = self.scene.mesh_nodes
         if mesh:
-            old_nodes = []
-            existing_axes = set([self._axes[k] for k in self._axes])
-            for node in self.scene.mesh_nodes:
-                if node not in existing_axes:
-                    old_nodes.append(node)
-
-            for node in old_nodes:
-                if node in self._axes:
-                    continue
+            # Mesh nodes needing an axis: skip the axis nodes
+            # themselves and nodes that already have one
+            new_parents = (mesh_nodes - set(self._axes.values()) -
+                           self._axes.keys())
+            to_add = []
+            for node in new_parents:
                 n = Node(
                     mesh=self._axis_mesh,
                     scale=np.ones(3) * node.mesh.scale * 0.5
                 )
-                self.scene.add_node(n, parent_node=node)
+                to_add.append((n, node))
                 self._axes[node] = n
+            if to_add:
+                self.scene.add_nodes_bulk(to_add)
         else:
-            to_remove = set()
-            for main_node in self._axes:
-                if main_node in self.scene.mesh_nodes:
-                    self.scene.remove_node(self._axes[main_node])
-                    to_remove.add(main_node)
-            for main_node in to_remove:
-                self._axes.pop(main_node)
+            to_remove = [m for m in self._axes if m in mesh_nodes]
+            if to_remove:
+                self.scene.remove_nodes_bulk(
+                    [self._axes.pop(m) for m in to_remove]
+                )
 
     def _remove_axes(self):
         for main_node in self._axes:
@@ -1134,27 +1627,34 @@ class Viewer(pyglet.window.Window):
         self._axes = {}
 
     def _location_to_x_y(self, location):
-        if location == TextAlign.CENTER:
-            return (self.viewport_size[0] / 2.0, self.viewport_size[1] / 2.0)
-        elif location == TextAlign.CENTER_LEFT:
-            return (TEXT_PADDING, self.viewport_size[1] / 2.0)
-        elif location == TextAlign.CENTER_RIGHT:
-            return (self.viewport_size[0] - TEXT_PADDING,
-                    self.viewport_size[1] / 2.0)
-        elif location == TextAlign.BOTTOM_LEFT:
-            return (TEXT_PADDING, TEXT_PADDING)
-        elif location == TextAlign.BOTTOM_RIGHT:
-            return (self.viewport_size[0] - TEXT_PADDING, TEXT_PADDING)
-        elif location == TextAlign.BOTTOM_CENTER:
-            return (self.viewport_size[0] / 2.0, TEXT_PADDING)
-        elif location == TextAlign.TOP_LEFT:
-            return (TEXT_PADDING, self.viewport_size[1] - TEXT_PADDING)
-        elif location == TextAlign.TOP_RIGHT:
-            return (self.viewport_size[0] - TEXT_PADDING,
-                    self.viewport_size[1] - TEXT_PADDING)
-        elif location == TextAlign.TOP_CENTER:
-            return (self.viewport_size[0] / 2.0,
-                    self.viewport_size[1] - TEXT_PADDING)
+        # The anchor table is rebuilt lazily after a resize clears it,
+        # so the steady-state cost is one dict lookup
+        if not self._caption_cache:
+            self._rebuild_text_anchors()
+        return self._caption_cache[location]
+
+    def _rebuild_text_anchors(self):
+        """Precompute the x/y anchor for every text alignment at the
+        current viewport size.
+        """
+        w, h = self.viewport_size
+        left = TEXT_PADDING
+        right = w - TEXT_PADDING
+        bottom = TEXT_PADDING
+        top = h - TEXT_PADDING
+        cx = w / 2.0
+        cy = h / 2.0
+        self._caption_cache = {
+            TextAlign.CENTER: (cx, cy),
+            TextAlign.CENTER_LEFT: (left, cy),
+            TextAlign.CENTER_RIGHT: (right, cy),
+            TextAlign.BOTTOM_LEFT: (left, bottom),
+            TextAlign.BOTTOM_RIGHT: (right, bottom),
+            TextAlign.BOTTOM_CENTER: (cx, bottom),
+            TextAlign.TOP_LEFT: (left, top),
+            TextAlign.TOP_RIGHT: (right, top),
+            TextAlign.TOP_CENTER: (cx, top),
+        }
 
 
 __all__ = ['Viewer']
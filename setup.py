@@ -17,7 +17,6 @@ def get_imageio_dep():
 requirements = [
     'freetype-py',                # For font loading
     get_imageio_dep(),            # For Image I/O
-    'networkx',                   # For the scene graph
     'numpy',                      # Numpy
     'Pillow',                     # For Trimesh texture conversions
     'pyglet>=1.4.10',             # For the pyglet viewer
@@ -33,6 +32,7 @@ dev_requirements = [
     'pre-commit',        # Pre-commit hooks
     'pytest',            # Code testing
     'pytest-cov',        # Coverage testing
+    'pytest-xdist',      # Parallel testing
     'tox',               # Automatic virtualenv testing
 ]
 
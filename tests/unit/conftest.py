@@ -0,0 +1,93 @@
+import functools
+
+import numpy as np
+import pytest
+import trimesh
+
+from pyrender import OffscreenRenderer
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        'markers',
+        'slow: full-resolution render checks; deselect with -m "not slow"')
+
+
+# Loading and decoding the example assets dominates unit-test time, so
+# each one is read from disk once per session. The fixtures hand out the
+# shared instance - tests that mutate a mesh must take a .copy() first.
+
+
+@pytest.fixture(scope='session')
+def fuze_trimesh():
+    return trimesh.load('tests/data/fuze.obj')
+
+
+@pytest.fixture(scope='session')
+def drill_trimesh():
+    return trimesh.load('tests/data/drill.obj')
+
+
+@pytest.fixture(scope='session')
+def wood_trimesh():
+    return trimesh.load('tests/data/wood.obj')
+
+
+@pytest.fixture(scope='session')
+def water_bottle_trimesh():
+    gltf = trimesh.load('tests/data/WaterBottle.glb')
+    return gltf.geometry[list(gltf.geometry.keys())[0]]
+
+
+@functools.lru_cache(maxsize=None)
+def _box_cached(extents_key):
+    return trimesh.creation.box(extents=np.array(extents_key))
+
+
+@pytest.fixture(scope='session')
+def box():
+    # Canonical boxes built once per extents; pass copy=False when the
+    # test only reads the mesh, copy=True (the default) before mutating
+    def _box(extents=(1.0, 1.0, 1.0), copy=True):
+        m = _box_cached(tuple(float(e) for e in extents))
+        return m.copy() if copy else m
+    return _box
+
+
+@pytest.fixture(scope='session')
+def close_all():
+    # One batched max-abs-difference comparison for a group of
+    # actual/expected pairs, instead of one np.allclose dispatch per
+    # tiny array. The default atol admits float32 rounding of O(1)
+    # values while staying tighter than np.allclose's default
+    # rtol-scaled bound at these magnitudes.
+    def _close_all(pairs, atol=1.e-6):
+        actual = np.concatenate([np.ravel(a) for a, _ in pairs])
+        expected = np.concatenate([np.ravel(e) for _, e in pairs])
+        return float(np.max(np.abs(actual - expected))) <= atol
+    return _close_all
+
+
+@pytest.fixture(scope='session')
+def identity_poses():
+    # Stacked 4x4 identities built by writing n*4 diagonal entries into
+    # zeros, instead of np.tile block-copying an eye(4) n times; callers
+    # write their translations into the result
+    def _identity_poses(n):
+        poses = np.zeros((n, 4, 4))
+        i = np.arange(4)
+        poses[:, i, i] = 1.0
+        return poses
+    return _identity_poses
+
+
+@pytest.fixture(scope='session')
+def offscreen_renderer():
+    # GL context creation and shader compilation are the heaviest
+    # single setup in the suite, so one renderer serves every
+    # offscreen test. Tests may retarget the viewport by assigning
+    # viewport_width/viewport_height; none should rely on residual GL
+    # state - each builds its own Scene.
+    r = OffscreenRenderer(viewport_width=640, viewport_height=480)
+    yield r
+    r.delete()
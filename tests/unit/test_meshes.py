@@ -5,7 +5,8 @@ import trimesh
 from pyrender import (Mesh, Primitive)
 
 
-def test_meshes():
+def test_meshes(fuze_trimesh, water_bottle_trimesh, identity_poses,
+                close_all, box):
 
     with pytest.raises(TypeError):
         x = Mesh()
@@ -23,17 +24,16 @@ def test_meshes():
     x.name = 'str'
 
     # From Trimesh
-    x = Mesh.from_trimesh(trimesh.creation.box())
+    x = Mesh.from_trimesh(box(copy=False))
     assert isinstance(x, Mesh)
     assert len(x.primitives) == 1
     assert x.is_visible
-    assert np.allclose(x.bounds, np.array([
-        [-0.5, -0.5, -0.5],
-        [0.5, 0.5, 0.5]
-    ]))
-    assert np.allclose(x.centroid, np.zeros(3))
-    assert np.allclose(x.extents, np.ones(3))
-    assert np.allclose(x.scale, np.sqrt(3))
+    assert close_all([
+        (x.bounds, np.array([[-0.5, -0.5, -0.5], [0.5, 0.5, 0.5]])),
+        (x.centroid, np.zeros(3)),
+        (x.extents, np.ones(3)),
+        (x.scale, np.sqrt(3)),
+    ])
     assert not x.is_transparent
 
     # Test some primitive functions
@@ -49,30 +49,28 @@ def test_meshes():
     with pytest.raises(TypeError):
         x.material = np.zeros(10)
     assert x.targets is None
-    assert np.allclose(x.bounds, np.array([
-        [-0.5, -0.5, -0.5],
-        [0.5, 0.5, 0.5]
-    ]))
-    assert np.allclose(x.centroid, np.zeros(3))
-    assert np.allclose(x.extents, np.ones(3))
-    assert np.allclose(x.scale, np.sqrt(3))
+    assert close_all([
+        (x.bounds, np.array([[-0.5, -0.5, -0.5], [0.5, 0.5, 0.5]])),
+        (x.centroid, np.zeros(3)),
+        (x.extents, np.ones(3)),
+        (x.scale, np.sqrt(3)),
+    ])
     x.material.baseColorFactor = np.array([0.0, 0.0, 0.0, 0.0])
     assert x.is_transparent
 
     # From two trimeshes
-    x = Mesh.from_trimesh([trimesh.creation.box(),
+    x = Mesh.from_trimesh([box(copy=False),
                           trimesh.creation.cylinder(radius=0.1, height=2.0)],
                           smooth=False)
     assert isinstance(x, Mesh)
     assert len(x.primitives) == 2
     assert x.is_visible
-    assert np.allclose(x.bounds, np.array([
-        [-0.5, -0.5, -1.0],
-        [0.5, 0.5, 1.0]
-    ]))
-    assert np.allclose(x.centroid, np.zeros(3))
-    assert np.allclose(x.extents, [1.0, 1.0, 2.0])
-    assert np.allclose(x.scale, np.sqrt(6))
+    assert close_all([
+        (x.bounds, np.array([[-0.5, -0.5, -1.0], [0.5, 0.5, 1.0]])),
+        (x.centroid, np.zeros(3)),
+        (x.extents, [1.0, 1.0, 2.0]),
+        (x.scale, np.sqrt(6)),
+    ])
     assert not x.is_transparent
 
     # From bad data
@@ -80,50 +78,55 @@ def test_meshes():
         x = Mesh.from_trimesh(None)
 
     # With instancing
-    poses = np.tile(np.eye(4), (5,1,1))
+    poses = identity_poses(5)
     poses[:,0,3] = np.array([0,1,2,3,4])
-    x = Mesh.from_trimesh(trimesh.creation.box(), poses=poses)
+    x = Mesh.from_trimesh(box(copy=False), poses=poses)
     assert np.allclose(x.bounds, np.array([
         [-0.5, -0.5, -0.5],
         [4.5, 0.5, 0.5]
     ]))
     poses = np.eye(4)
-    x = Mesh.from_trimesh(trimesh.creation.box(), poses=poses)
+    x = Mesh.from_trimesh(box(copy=False), poses=poses)
     poses = np.eye(3)
     with pytest.raises(ValueError):
-        x = Mesh.from_trimesh(trimesh.creation.box(), poses=poses)
+        x = Mesh.from_trimesh(box(copy=False), poses=poses)
+
+    x = Mesh.from_trimesh(water_bottle_trimesh)
+    assert x.primitives[0].material.baseColorTexture is not None
+    assert x.primitives[0].material.emissiveTexture is not None
+    assert x.primitives[0].material.metallicRoughnessTexture is not None
+
+    # From point cloud
+    x = Mesh.from_points(fuze_trimesh.vertices)
 
-    # From textured meshes
-    fm = trimesh.load('tests/data/fuze.obj')
-    x = Mesh.from_trimesh(fm)
+
+@pytest.mark.parametrize('smooth', [False, True])
+def test_textured_mesh_conversion(fuze_trimesh, smooth):
+    # Textured visuals convert under either shading mode
+    x = Mesh.from_trimesh(fuze_trimesh, smooth=smooth)
     assert isinstance(x, Mesh)
     assert len(x.primitives) == 1
     assert x.is_visible
     assert not x.is_transparent
     assert x.primitives[0].material.baseColorTexture is not None
 
-    x = Mesh.from_trimesh(fm, smooth=False)
+    # Face colors only make sense unsmoothed; copied since the visual
+    # gets replaced
+    fm = fuze_trimesh.copy()
     fm.visual = fm.visual.to_color()
     fm.visual.face_colors = np.array([1.0, 0.0, 0.0, 1.0])
-    x = Mesh.from_trimesh(fm, smooth=False)
-    with pytest.raises(ValueError):
-        x = Mesh.from_trimesh(fm, smooth=True)
+    if smooth:
+        with pytest.raises(ValueError):
+            x = Mesh.from_trimesh(fm, smooth=True)
+    else:
+        x = Mesh.from_trimesh(fm, smooth=False)
 
+    # Vertex colors work either way
     fm.visual.vertex_colors = np.array([1.0, 0.0, 0.0, 0.5])
-    x = Mesh.from_trimesh(fm, smooth=False)
-    x = Mesh.from_trimesh(fm, smooth=True)
+    x = Mesh.from_trimesh(fm, smooth=smooth)
     assert x.primitives[0].color_0 is not None
     assert x.is_transparent
 
-    bm = trimesh.load('tests/data/WaterBottle.glb').dump()[0]
-    x = Mesh.from_trimesh(bm)
-    assert x.primitives[0].material.baseColorTexture is not None
-    assert x.primitives[0].material.emissiveTexture is not None
-    assert x.primitives[0].material.metallicRoughnessTexture is not None
-
-    # From point cloud
-    x = Mesh.from_points(fm.vertices)
-
 # def test_duck():
 #     bm = trimesh.load('tests/data/Duck.glb').dump()[0]
 #     x = Mesh.from_trimesh(bm)
@@ -1,3 +1,5 @@
+from types import SimpleNamespace
+
 import numpy as np
 import pytest
 from trimesh import transformations
@@ -5,7 +7,33 @@ from trimesh import transformations
 from pyrender import (DirectionalLight, PerspectiveCamera, Mesh, Node)
 
 
-def test_nodes():
+@pytest.fixture(scope='module')
+def rotation_ref():
+    # Reference rotations, quaternions and composed matrices, built once
+    # instead of per-test through the transformations module
+    x = np.array([1.0, 0.0, 0.0])
+    y = np.array([0.0, 1.0, 0.0])
+    t = np.array([1.0, 2.0, 3.0])
+    s = np.array([0.5, 2.0, 1.0])
+
+    Mx = transformations.rotation_matrix(np.pi / 2.0, x)
+    qx = np.roll(transformations.quaternion_about_axis(np.pi / 2.0, x), -1)
+    Mxt = Mx.copy()
+    Mxt[:3,3] = t
+    S = np.eye(4)
+    S[:3,:3] = np.diag(s)
+    Mxts = Mxt.dot(S)
+
+    My = transformations.rotation_matrix(np.pi / 2.0, y)
+    qy = np.roll(transformations.quaternion_about_axis(np.pi / 2.0, y), -1)
+    Myt = My.copy()
+    Myt[:3,3] = t
+
+    return SimpleNamespace(Mx=Mx, qx=qx, My=My, qy=qy,
+                           Mxt=Mxt, Mxts=Mxts, Myt=Myt, t=t, s=s)
+
+
+def test_nodes(rotation_ref):
 
     x = Node()
     assert x.name is None
@@ -44,24 +72,9 @@ def test_nodes():
         x.light = c
 
     # Test transformations getters/setters/etc...
-    # Set up test values
-    x = np.array([1.0, 0.0, 0.0])
-    y = np.array([0.0, 1.0, 0.0])
-    t = np.array([1.0, 2.0, 3.0])
-    s = np.array([0.5, 2.0, 1.0])
-
-    Mx = transformations.rotation_matrix(np.pi / 2.0, x)
-    qx = np.roll(transformations.quaternion_about_axis(np.pi / 2.0, x), -1)
-    Mxt = Mx.copy()
-    Mxt[:3,3] = t
-    S = np.eye(4)
-    S[:3,:3] = np.diag(s)
-    Mxts = Mxt.dot(S)
-
-    My = transformations.rotation_matrix(np.pi / 2.0, y)
-    qy = np.roll(transformations.quaternion_about_axis(np.pi / 2.0, y), -1)
-    Myt = My.copy()
-    Myt[:3,3] = t
+    r = rotation_ref
+    Mx, qx, My, qy = r.Mx, r.qx, r.My, r.qy
+    Mxt, Mxts, Myt, t, s = r.Mxt, r.Mxts, r.Myt, r.t, r.s
 
     x = Node(matrix=Mx)
     assert np.allclose(x.matrix, Mx)
@@ -1,31 +1,39 @@
 import numpy as np
+import pytest
 import trimesh
 
-from pyrender import (OffscreenRenderer, PerspectiveCamera, DirectionalLight,
+from pyrender import (PerspectiveCamera, DirectionalLight,
                       SpotLight, Mesh, Node, Scene)
 
+# One seeded block of random colors sliced by every consumer below -
+# deterministic across runs and generated in a single draw
+_COLORS = np.random.default_rng(0).random((4096, 3))
 
-def test_offscreen_renderer(tmpdir):
+
+def _random_colors(n):
+    return _COLORS[:n]
+
+
+@pytest.fixture(scope='module')
+def render_scene(fuze_trimesh, drill_trimesh, wood_trimesh,
+                 water_bottle_trimesh, identity_poses, box):
+    # One fully-populated scene shared by the render tests below; the
+    # tests only read it, so building it per-test would be pure waste
 
     # Fuze trimesh
-    fuze_trimesh = trimesh.load('examples/models/fuze.obj')
     fuze_mesh = Mesh.from_trimesh(fuze_trimesh)
 
     # Drill trimesh
-    drill_trimesh = trimesh.load('examples/models/drill.obj')
     drill_mesh = Mesh.from_trimesh(drill_trimesh)
     drill_pose = np.eye(4)
     drill_pose[0,3] = 0.1
     drill_pose[2,3] = -np.min(drill_trimesh.vertices[:,2])
 
     # Wood trimesh
-    wood_trimesh = trimesh.load('examples/models/wood.obj')
     wood_mesh = Mesh.from_trimesh(wood_trimesh)
 
     # Water bottle trimesh
-    bottle_gltf = trimesh.load('examples/models/WaterBottle.glb')
-    bottle_trimesh = bottle_gltf.geometry[list(bottle_gltf.geometry.keys())[0]]
-    bottle_mesh = Mesh.from_trimesh(bottle_trimesh)
+    bottle_mesh = Mesh.from_trimesh(water_bottle_trimesh)
     bottle_pose = np.array([
         [1.0, 0.0, 0.0, 0.1],
         [0.0, 0.0, -1.0, -0.16],
@@ -33,21 +41,21 @@ def test_offscreen_renderer(tmpdir):
         [0.0, 0.0, 0.0, 1.0],
     ])
 
-    boxv_trimesh = trimesh.creation.box(extents=0.1 * np.ones(3))
-    boxv_vertex_colors = np.random.uniform(size=(boxv_trimesh.vertices.shape))
+    boxv_trimesh = box(extents=0.1 * np.ones(3))
+    boxv_vertex_colors = _random_colors(len(boxv_trimesh.vertices))
     boxv_trimesh.visual.vertex_colors = boxv_vertex_colors
     boxv_mesh = Mesh.from_trimesh(boxv_trimesh, smooth=False)
-    boxf_trimesh = trimesh.creation.box(extents=0.1 * np.ones(3))
-    boxf_face_colors = np.random.uniform(size=boxf_trimesh.faces.shape)
+    boxf_trimesh = box(extents=0.1 * np.ones(3))
+    boxf_face_colors = _random_colors(len(boxf_trimesh.faces))
     boxf_trimesh.visual.face_colors = boxf_face_colors
     # Instanced
-    poses = np.tile(np.eye(4), (2,1,1))
+    poses = identity_poses(2)
     poses[0,:3,3] = np.array([-0.1, -0.10, 0.05])
     poses[1,:3,3] = np.array([-0.15, -0.10, 0.05])
     boxf_mesh = Mesh.from_trimesh(boxf_trimesh, poses=poses, smooth=False)
 
     points = trimesh.creation.icosphere(radius=0.05).vertices
-    point_colors = np.random.uniform(size=points.shape)
+    point_colors = _random_colors(len(points))
     points_mesh = Mesh.from_points(points, colors=point_colors)
 
     direc_l = DirectionalLight(color=np.ones(3), intensity=1.0)
@@ -82,11 +90,31 @@ def test_offscreen_renderer(tmpdir):
 
     _ = scene.add(cam, pose=cam_pose)
 
-    r = OffscreenRenderer(viewport_width=640, viewport_height=480)
-    color, depth = r.render(scene)
+    return scene
+
+
+def test_offscreen_renderer(offscreen_renderer, render_scene):
+    # A thumbnail is enough to catch rendering regressions and keeps the
+    # per-run rasterization cost low
+    r = offscreen_renderer
+    r.viewport_width = 160
+    r.viewport_height = 120
+    color, depth = r.render(render_scene)
+
+    assert color.shape == (120, 160, 3)
+    assert depth.shape == (120, 160)
+    assert np.max(depth.data) > 0.05
+    assert np.count_nonzero(depth.data) > (0.2 * depth.size)
+
+
+@pytest.mark.slow
+def test_offscreen_renderer_full_res(offscreen_renderer, render_scene):
+    r = offscreen_renderer
+    r.viewport_width = 640
+    r.viewport_height = 480
+    color, depth = r.render(render_scene)
 
     assert color.shape == (480, 640, 3)
     assert depth.shape == (480, 640)
     assert np.max(depth.data) > 0.05
     assert np.count_nonzero(depth.data) > (0.2 * depth.size)
-    r.delete()
@@ -6,19 +6,37 @@ from pyrender import (Mesh, PerspectiveCamera, DirectionalLight,
                       SpotLight, PointLight, Scene, Node, OrthographicCamera)
 
 
-def test_scenes():
+@pytest.fixture
+def three_nodes():
+    return Node(), Node(), Node()
+
+
+@pytest.fixture
+def chain_scene(three_nodes):
+    # The common n1 -> n2 -> n3 chain, built once per test that needs it
+    n1, n2, n3 = three_nodes
+    n1.children.append(n2)
+    n2.children.append(n3)
+    return Scene(nodes=[n1, n2, n3]), n1, n2, n3
+
+
+def test_scene_defaults(close_all):
 
     # Basics
     s = Scene()
-    assert np.allclose(s.bg_color, np.ones(4))
-    assert np.allclose(s.ambient_light, np.zeros(3))
+    assert close_all([
+        (s.bg_color, np.ones(4)),
+        (s.ambient_light, np.zeros(3)),
+    ])
     assert len(s.nodes) == 0
     assert s.name is None
     s.name = 'asdf'
     s.bg_color = None
     s.ambient_light = None
-    assert np.allclose(s.bg_color, np.ones(4))
-    assert np.allclose(s.ambient_light, np.zeros(3))
+    assert close_all([
+        (s.bg_color, np.ones(4)),
+        (s.ambient_light, np.zeros(3)),
+    ])
 
     assert s.nodes == set()
     assert s.cameras == set()
@@ -49,10 +67,11 @@ def test_scenes():
     s = Scene(bg_color=[0, 1.0, 0])
     assert np.allclose(s.bg_color, np.array([0.0, 1.0, 0.0, 1.0]))
 
+
+def test_scene_poses(three_nodes):
+
     # Test constructor for nodes
-    n1 = Node()
-    n2 = Node()
-    n3 = Node()
+    n1, n2, n3 = three_nodes
     nodes = [n1, n2, n3]
     s = Scene(nodes=nodes)
     n1.children.append(n2)
@@ -114,13 +133,16 @@ def test_scenes():
     s.set_pose(n2, tf2)
     assert np.allclose(s.get_pose(n2), tf.dot(tf2))
 
+
+def test_scene_add_remove(chain_scene):
+
+    tf = np.eye(4)
+    tf[:3,3] = np.ones(3)
+    tf2 = np.eye(4)
+    tf2[:3,:3] = np.diag([-1,-1,1])
+
     # Test node removal
-    n1 = Node()
-    n2 = Node()
-    n3 = Node()
-    n1.children.append(n2)
-    n2.children.append(n3)
-    s = Scene(nodes=[n1, n2, n3])
+    s, n1, n2, n3 = chain_scene
     s.remove_node(n2)
     assert len(s.nodes) == 1
     assert n1 in s.nodes
@@ -208,11 +230,13 @@ def test_scenes():
     with pytest.raises(TypeError):
         s.add(None)
 
-    s.clear()
-    # Test bounds
-    m1 = Mesh.from_trimesh(trimesh.creation.box())
-    m2 = Mesh.from_trimesh(trimesh.creation.box())
-    m3 = Mesh.from_trimesh(trimesh.creation.box())
+
+def test_scene_bounds(box):
+
+    s = Scene()
+    m1 = Mesh.from_trimesh(box(copy=False))
+    m2 = Mesh.from_trimesh(box(copy=False))
+    m3 = Mesh.from_trimesh(box(copy=False))
     n1 = Node(mesh=m1)
     n2 = Node(mesh=m2, translation=[1.0, 0.0, 0.0])
     n3 = Node(mesh=m3, translation=[0.5, 0.0, 1.0])